@@ -0,0 +1,153 @@
+"""
+Initial schedule allocation: the local weighted engine versus the LLM path
+(against the fake Ollama server) and the old equal-split fallback.
+
+Error is measured against the exact weighted split the prompt asks for
+(UNKNOWN +20%, KNOWN -10%, minimum 5 minutes) before rounding: the sum of
+absolute per-topic differences, plus how far the total is off.
+
+    cd backend && python benchmarks/bench_allocation.py
+
+The fake server answers with an equal split, much like a model that ignores
+the weight rules; point OLLAMA_BASE_URL at a real Ollama to measure a real
+model instead (the server is then not started).
+"""
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fake_ollama import create_app  # noqa: E402
+from services.allocation_cache import allocation_cache  # noqa: E402
+from services.allocation_engine import LEVEL_WEIGHTS, MIN_TOPIC_MINUTES, allocation_engine  # noqa: E402
+from services.ollama_service import OllamaService  # noqa: E402
+from models.schemas import TopicLevel  # noqa: E402
+
+PORT = 11439
+FAKE_LATENCY_MS = 300
+CASES = 20
+ENGINE_ITERATIONS = 2000
+
+
+def make_case(rng: random.Random):
+    count = rng.randint(2, 12)
+    topics = [
+        {"name": f"Topic {i}", "subject": "General", "level": rng.choice(list(TopicLevel)).value}
+        for i in range(count)
+    ]
+    total = rng.randint(MIN_TOPIC_MINUTES * count, 240)
+    return topics, total
+
+
+def ideal_split(topics, total):
+    """Continuous weighted split with the minimum, i.e. what the prompt asks for"""
+    weights = [LEVEL_WEIGHTS[TopicLevel(t["level"])] for t in topics]
+    shares = [0.0] * len(topics)
+    free = set(range(len(topics)))
+    budget = float(total)
+    while True:
+        weight_sum = sum(weights[i] for i in free)
+        low = [i for i in free if budget * weights[i] / weight_sum < MIN_TOPIC_MINUTES]
+        if not low:
+            break
+        for i in low:
+            shares[i] = MIN_TOPIC_MINUTES
+            budget -= MIN_TOPIC_MINUTES
+            free.discard(i)
+    weight_sum = sum(weights[i] for i in free)
+    for i in free:
+        shares[i] = budget * weights[i] / weight_sum
+    return shares
+
+
+def equal_split(topics, total):
+    """The fallback this engine replaced"""
+    per_topic = max(5, int(total / len(topics)))
+    return [dict(t, time_minutes=per_topic) for t in topics]
+
+
+def error(topics, total, allocation):
+    by_name = {item["name"]: item["time_minutes"] for item in allocation}
+    ideal = ideal_split(topics, total)
+    l1 = sum(abs(by_name.get(t["name"], 0) - ideal[i]) for i, t in enumerate(topics))
+    return l1, abs(sum(by_name.values()) - total)
+
+
+def report(name, latencies, errors):
+    mean_l1 = sum(e[0] for e in errors) / len(errors)
+    off_total = sum(1 for e in errors if e[1])
+    mean_latency = sum(latencies) / len(latencies)
+    unit, scale = ("us", 1e6) if mean_latency < 1e-3 else ("ms", 1e3)
+    print(f"{name:<18} {mean_latency * scale:9.2f} {unit}  {mean_l1:7.2f} min  {off_total:>3}/{len(errors)}")
+
+
+async def llm_path(service, cases):
+    latencies, errors = [], []
+    for topics, total in cases:
+        started = time.perf_counter()
+        allocation = await service.allocate_initial_schedule(topics, total)
+        latencies.append(time.perf_counter() - started)
+        errors.append(error(topics, total, allocation))
+    return latencies, errors
+
+
+def main():
+    rng = random.Random(7)
+    cases = [make_case(rng) for _ in range(CASES)]
+
+    print(f"{'path':<18} {'latency':>12}  {'L1 error':>11}  wrong total")
+
+    latencies, errors = [], []
+    for topics, total in cases:
+        started = time.perf_counter()
+        for _ in range(ENGINE_ITERATIONS):
+            allocation = allocation_engine.allocate(topics, total)
+        latencies.append((time.perf_counter() - started) / ENGINE_ITERATIONS)
+        errors.append(error(topics, total, allocation))
+    report("local engine", latencies, errors)
+
+    latencies, errors = [], []
+    for topics, total in cases:
+        started = time.perf_counter()
+        for _ in range(ENGINE_ITERATIONS):
+            allocation = equal_split(topics, total)
+        latencies.append((time.perf_counter() - started) / ENGINE_ITERATIONS)
+        errors.append(error(topics, total, allocation))
+    report("equal split (old)", latencies, errors)
+
+    base_url = os.environ.get("OLLAMA_BASE_URL")
+    server = None
+    if not base_url:
+        app = create_app(latency_ms=FAKE_LATENCY_MS)
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        base_url = f"http://127.0.0.1:{PORT}"
+
+    allocation_cache.enabled = False
+    service = OllamaService()
+    service.base_url = base_url
+
+    async def run():
+        service.start()
+        try:
+            return await llm_path(service, cases)
+        finally:
+            await service.close()
+
+    report("llm" if server is None else "llm (fake server)", *asyncio.run(run()))
+
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
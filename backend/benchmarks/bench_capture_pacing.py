@@ -0,0 +1,70 @@
+"""
+Frames sent (i.e. inferences run) over a simulated one-hour session with the
+fixed 3 s capture interval versus the intervals the server suggests, and how
+long after the student starts to tire each one raises the break trigger.
+
+The simulated detector output is noisy: 40 minutes of a steady, mostly
+neutral student, then a gradual slide into "tired" until the trigger fires.
+
+    cd backend && python benchmarks/bench_capture_pacing.py
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config.settings import settings  # noqa: E402
+from models.schemas import EmotionType, Session  # noqa: E402
+from services.capture_pacer import capture_pacer  # noqa: E402
+from services.emotion_service import emotion_service  # noqa: E402
+
+SESSION_SECONDS = 3600
+STEADY_SECONDS = 40 * 60
+SLIDE_SECONDS = 10 * 60  # time for "tired" to go from unlikely to dominant
+RUNS = 20
+
+
+def detector_output(rng: random.Random, t: float):
+    """Probabilities a face model might give at time t, and the dominant emotion"""
+    tired = 0.05 if t < STEADY_SECONDS else min(0.85, 0.05 + 0.8 * (t - STEADY_SECONDS) / SLIDE_SECONDS)
+    weights = {
+        EmotionType.NEUTRAL.value: max(0.0, 0.75 - tired) + rng.uniform(0, 0.15),
+        EmotionType.HAPPY.value: 0.15 + rng.uniform(0, 0.1),
+        EmotionType.SAD.value: 0.03 + rng.uniform(0, 0.05),
+        EmotionType.TIRED.value: tired + rng.uniform(0, 0.1)
+    }
+    total = sum(weights.values())
+    probabilities = {emotion.value: weights.get(emotion.value, 0.0) / total for emotion in EmotionType}
+    return probabilities, EmotionType(max(probabilities, key=probabilities.get))
+
+
+def simulate(rng: random.Random, adaptive: bool):
+    session = Session(session_id="bench", topics=[])
+    t = 0.0
+    frames = 0
+    while t < SESSION_SECONDS:
+        probabilities, emotion = detector_output(rng, t)
+        emotion_service.add_emotion(session, emotion, probabilities)
+        frames += 1
+
+        trigger, _ = emotion_service.check_trigger(session)
+        if trigger:
+            return frames, t - STEADY_SECONDS
+
+        t += capture_pacer.next_interval_ms(session) / 1000 if adaptive else settings.CAPTURE_INTERVAL_MS / 1000
+    return frames, None
+
+
+def main():
+    print(f"{RUNS} simulated sessions, steady for {STEADY_SECONDS // 60} min, then tiring")
+    for label, adaptive in (("fixed 3 s", False), ("adaptive", True)):
+        results = [simulate(random.Random(seed), adaptive) for seed in range(RUNS)]
+        frames = sum(r[0] for r in results) / RUNS
+        latencies = [r[1] for r in results if r[1] is not None]
+        detected = f"{sum(latencies) / len(latencies) / 60:.1f} min after the slide began" if latencies else "never"
+        print(f"  {label:<10} {frames:7.0f} frames per session   trigger {detected} ({len(latencies)}/{RUNS})")
+
+
+if __name__ == "__main__":
+    main()
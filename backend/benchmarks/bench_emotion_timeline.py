@@ -0,0 +1,111 @@
+"""
+Memory and per-frame cost of the session emotion history: the array-backed
+EmotionTimeline versus keeping the same full history as a plain list of
+(EmotionType, datetime), and the old capped list that re-sliced itself and
+re-parsed NEGATIVE_EMOTIONS on every frame.
+
+    cd backend && python benchmarks/bench_emotion_timeline.py
+"""
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config.settings import settings  # noqa: E402
+from models.schemas import EmotionType  # noqa: E402
+from services.emotion_timeline import EmotionTimeline  # noqa: E402
+
+CAPTURE_INTERVALS = (3, 1)  # seconds between frames; the dashboard sends one every 3 s
+FRAMES = 100_000
+
+
+def frames_per_hour(interval: int) -> int:
+    return 3600 // interval
+
+
+def emotions(count: int):
+    rng = random.Random(23)
+    choices = list(EmotionType)
+    return [rng.choice(choices) for _ in range(count)]
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, kept
+
+
+def timeline_hour(stream):
+    timeline = EmotionTimeline()
+    start_ms = int(time.time() * 1000)
+    for i, emotion in enumerate(stream):
+        timeline.append(emotion, start_ms + i * 1000)
+    return timeline
+
+
+def list_hour(stream):
+    now = datetime.utcnow()
+    return [(emotion, now.replace(microsecond=i % 1_000_000)) for i, emotion in enumerate(stream)]
+
+
+def old_per_frame(stream):
+    buffer = []
+    for emotion in stream:
+        buffer.append(emotion)
+        if len(buffer) > settings.EMOTION_BUFFER_SIZE:
+            buffer = buffer[-settings.EMOTION_BUFFER_SIZE:]
+        if len(buffer) >= settings.EMOTION_BUFFER_SIZE:
+            all(e.value in settings.negative_emotions_list for e in buffer[-settings.EMOTION_BUFFER_SIZE:])
+
+
+def timeline_per_frame(stream):
+    timeline = EmotionTimeline()
+    for emotion in stream:
+        timeline.append(emotion)
+        if timeline.window_full:
+            timeline.window_all_negative
+
+
+def main():
+    print("memory for one hour of history")
+    for interval in CAPTURE_INTERVALS:
+        stream = emotions(frames_per_hour(interval))
+        timeline_bytes, timeline = measure(lambda: timeline_hour(stream))
+        list_bytes, history = measure(lambda: list_hour(stream))
+        timeline_json = len(json.dumps(timeline.to_dict()))
+        list_json = len(json.dumps([[e.value, t.isoformat()] for e, t in history]))
+        print(f"  every {interval} s ({len(stream)} frames):"
+              f"  timeline {timeline_bytes / 1024:6.1f} KiB ({timeline.nbytes() / 1024:.1f} KiB buffers, {timeline_json / 1024:.1f} KiB stored)"
+              f"   list {list_bytes / 1024:6.1f} KiB ({list_json / 1024:.1f} KiB stored)")
+
+    stream = emotions(FRAMES)
+    print(f"per frame, append + trigger check ({FRAMES} frames)")
+    for label, run in (("old capped list", old_per_frame), ("timeline", timeline_per_frame)):
+        started = time.perf_counter()
+        run(stream)
+        print(f"  {label:<16} {(time.perf_counter() - started) / FRAMES * 1e6:6.2f} us")
+
+    timeline = timeline_hour(stream)
+    started = time.perf_counter()
+    for _ in range(1000):
+        timeline.distribution()
+    summary_us = (time.perf_counter() - started) / 1000 * 1e6
+    started = time.perf_counter()
+    for _ in range(100):
+        counts = {}
+        for emotion in timeline.history():
+            counts[emotion.value] = counts.get(emotion.value, 0) + 1
+    rescan_us = (time.perf_counter() - started) / 100 * 1e6
+    print(f"summary over {FRAMES} entries: incremental counts {summary_us:.2f} us, rescan {rescan_us:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
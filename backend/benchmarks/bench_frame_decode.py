@@ -0,0 +1,65 @@
+"""
+Per-frame decode cost: the original full-resolution colour decode versus
+the reduced-scale paths the inference workers use.
+
+    cd backend && python benchmarks/bench_frame_decode.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config.settings import settings  # noqa: E402
+from services.frame_decoder import choose_scale, decode_frame, jpeg_size  # noqa: E402
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+EMOTION_INPUT_SIZE = 48
+ITERATIONS = 200
+
+
+def make_frame(width: int, height: int) -> bytes:
+    """Webcam-like JPEG: smooth background, noise and a bright face-sized blob"""
+    rng = np.random.default_rng(0)
+    x, y = np.meshgrid(np.linspace(0, 255, width), np.linspace(0, 255, height))
+    img = np.stack([(x + y) / 2, x * 0.8 + 20, y * 0.6 + 40], axis=-1)
+    img += rng.normal(0, 8, img.shape)
+    cv2.ellipse(img, (width // 2, height // 2), (width // 8, height // 5), 0, 0, 360, (190, 170, 150), -1)
+    ok, encoded = cv2.imencode(".jpg", np.clip(img, 0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 70])
+    return encoded.tobytes()
+
+
+def time_ms(fn) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - started) / ITERATIONS * 1000
+
+
+def main() -> None:
+    print(f"{'frame':>11} {'bytes':>8} {'full colour':>12} {'detector':>14} {'tracked':>14} {'speedup':>8}")
+
+    for width, height in RESOLUTIONS:
+        frame = make_frame(width, height)
+        face_width = width // 4
+
+        detect_scale = choose_scale(min(jpeg_size(frame)), settings.EMOTION_DETECT_MIN_SIDE)
+        track_scale = choose_scale(face_width, EMOTION_INPUT_SIZE)
+
+        baseline = time_ms(lambda: cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR))
+        detector = time_ms(lambda: decode_frame(frame, scale=detect_scale))
+        tracked = time_ms(lambda: decode_frame(frame, grayscale=True, scale=track_scale))
+
+        print(
+            f"{width:>5}x{height:<5} {len(frame):>8} {baseline:>10.2f}ms "
+            f"{detector:>8.2f}ms (1/{detect_scale}) {tracked:>8.2f}ms (1/{track_scale}) "
+            f"{baseline / tracked:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Allocation latency after idle gaps longer than the model's keep_alive, with
+and without keep-warm pings in between, against the fake Ollama server with
+a simulated model load. Also prints Ollama's own load / prompt-eval / eval
+breakdown as recorded per call.
+
+    cd backend && python benchmarks/bench_keep_warm.py
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fake_ollama import create_app  # noqa: E402
+from services.ollama_service import OllamaService  # noqa: E402
+
+PORT = 11440
+LOAD_MS = 1500  # a 7B model from a warm page cache; several seconds from disk
+PROMPT_LATENCY_MS = 100
+KEEP_ALIVE = "1s"
+IDLE_SECONDS = 2.0
+PING_EVERY_SECONDS = 0.5
+CALLS = 4
+TOPICS = [{"name": f"Topic {i}", "subject": "Physics", "level": "partial"} for i in range(6)]
+
+
+def start_fake_ollama() -> uvicorn.Server:
+    app = create_app(latency_ms=PROMPT_LATENCY_MS, load_ms=LOAD_MS)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def idle(service: OllamaService, keep_warm: bool) -> None:
+    deadline = time.monotonic() + IDLE_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(PING_EVERY_SECONDS)
+        if keep_warm:
+            await service.keep_warm()
+
+
+async def run(keep_warm: bool) -> None:
+    service = OllamaService()
+    service.base_url = f"http://127.0.0.1:{PORT}"
+    service.keep_alive = KEEP_ALIVE
+    service.streaming = False
+    service.start()
+
+    latencies = []
+    try:
+        for _ in range(CALLS):
+            await idle(service, keep_warm)
+            started = time.perf_counter()
+            await service._propose_with_llm(TOPICS, 90)
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        await service.close()
+
+    stats = service.metrics.get_stats()
+    label = "keep-warm" if keep_warm else "no pings"
+    print(f"{label:<10} calls {' '.join(f'{ms:6.0f}' for ms in latencies)} ms"
+          f"   load p50 {stats['load_ms']['p50']:7.1f} ms"
+          f"   prompt eval p50 {stats['prompt_eval_ms']['p50']:6.1f} ms"
+          f"   eval p50 {stats['eval_ms']['p50']:5.1f} ms"
+          f"   pings {service.keep_warm_pings}")
+
+
+async def main() -> None:
+    await run(keep_warm=False)
+    await run(keep_warm=True)
+
+
+if __name__ == "__main__":
+    server = start_fake_ollama()
+    asyncio.run(main())
+    server.should_exit = True
@@ -0,0 +1,81 @@
+"""
+Schedule allocation latency against the fake Ollama server with simulated
+token generation: the blocking call versus the streamed one, which has the
+first topic as soon as its JSON object closes.
+
+    cd backend && python benchmarks/bench_llm_streaming.py
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fake_ollama import create_app  # noqa: E402
+from services.allocation_cache import allocation_cache  # noqa: E402
+from services.ollama_service import OllamaService  # noqa: E402
+
+PORT = 11437
+PROMPT_LATENCY_MS = 150
+TOKEN_DELAY_MS = 15  # ~65 tokens/s, a 7B model on a laptop GPU
+TOPIC_COUNTS = [3, 8, 16]
+ROUNDS = 3
+
+
+def start_fake_ollama() -> uvicorn.Server:
+    app = create_app(latency_ms=PROMPT_LATENCY_MS, token_delay_ms=TOKEN_DELAY_MS)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def make_topics(count: int):
+    return [{"name": f"Topic {i}", "subject": "Physics", "level": "partial"} for i in range(count)]
+
+
+async def blocking(service: OllamaService, topics) -> float:
+    service.streaming = False
+    started = time.perf_counter()
+    await service.allocate_initial_schedule(topics, 120)
+    return time.perf_counter() - started
+
+
+async def streamed(service: OllamaService, topics):
+    started = time.perf_counter()
+    first = None
+    async for _ in service.stream_initial_schedule(topics, 120):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+async def main() -> None:
+    # Time the Ollama calls, not cache hits
+    allocation_cache.enabled = False
+    service = OllamaService()
+    service.base_url = f"http://127.0.0.1:{PORT}"
+    service.start()
+
+    print(f"{'topics':>6}  {'blocking':>10}  {'stream first':>12}  {'stream total':>12}")
+    try:
+        for count in TOPIC_COUNTS:
+            topics = make_topics(count)
+            block = min([await blocking(service, topics) for _ in range(ROUNDS)])
+            results = [await streamed(service, topics) for _ in range(ROUNDS)]
+            first = min(r[0] for r in results)
+            total = min(r[1] for r in results)
+            print(f"{count:>6}  {block * 1000:8.0f} ms  {first * 1000:9.0f} ms  {total * 1000:9.0f} ms")
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    server = start_fake_ollama()
+    asyncio.run(main())
+    server.should_exit = True
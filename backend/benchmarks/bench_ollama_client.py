@@ -0,0 +1,87 @@
+"""
+Concurrent schedule allocations against the fake Ollama server: wall time
+for N simultaneous requests and the worst event-loop stall meanwhile. With
+the old blocking client the stall equalled the whole LLM latency.
+
+    cd backend && python benchmarks/bench_ollama_client.py
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fake_ollama import create_app  # noqa: E402
+from config.settings import settings  # noqa: E402
+from services.allocation_cache import allocation_cache  # noqa: E402
+from services.ollama_service import OllamaService  # noqa: E402
+
+PORT = 11436
+LATENCY_MS = 200
+CONCURRENCY = [1, 8, 32]
+
+
+def make_topics(request: int):
+    # Distinct per request, or single-flight would coalesce them into one call
+    return [{"name": f"Topic {i}", "subject": f"Maths {request}", "level": "partial"} for i in range(6)]
+
+
+def start_fake_ollama() -> uvicorn.Server:
+    config = uvicorn.Config(create_app(latency_ms=LATENCY_MS), host="127.0.0.1", port=PORT, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def measure_stall(stop: asyncio.Event) -> float:
+    """Largest gap between 1 ms ticks of the loop"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        worst = max(worst, now - last - 0.001)
+        last = now
+    return worst
+
+
+async def run(service: OllamaService, concurrency: int) -> None:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_stall(stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        service.allocate_initial_schedule(make_topics(i), 90) for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    stall = await ticker
+    assert all(sum(t["time_minutes"] for t in r) == 90 for r in results)
+    print(f"{concurrency:>4} concurrent  {elapsed * 1000:8.1f} ms total  {stall * 1000:6.2f} ms worst loop stall")
+
+
+async def main() -> None:
+    # Time the Ollama calls, not cache hits
+    allocation_cache.enabled = False
+    service = OllamaService()
+    service.base_url = f"http://127.0.0.1:{PORT}"
+    service.start()
+    try:
+        print(f"Fake Ollama latency: {LATENCY_MS} ms per call, pool of {settings.OLLAMA_MAX_CONNECTIONS} connections")
+        for concurrency in CONCURRENCY:
+            await run(service, concurrency)
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    server = start_fake_ollama()
+    asyncio.run(main())
+    server.should_exit = True
@@ -0,0 +1,84 @@
+"""
+A class starting at once: many concurrent allocations for the same syllabus
+(each student's own spelling and order) versus the same number of distinct
+syllabi, against the fake Ollama server. Counts the generations the server
+actually ran; the allocation cache is off so only coalescing is measured.
+
+    cd backend && python benchmarks/bench_single_flight.py
+"""
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn  # noqa: E402
+
+from benchmarks.fake_ollama import create_app  # noqa: E402
+from services.allocation_cache import allocation_cache  # noqa: E402
+from services.ollama_service import OllamaService  # noqa: E402
+
+PORT = 11441
+PROMPT_LATENCY_MS = 300
+STUDENTS = 40
+SYLLABUS = ["Kinematics", "Dynamics", "Work and energy", "Momentum", "Rotation", "Gravitation"]
+
+
+def start_fake_ollama():
+    app = create_app(latency_ms=PROMPT_LATENCY_MS)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, app
+
+
+def student_topics(rng: random.Random, student: int, identical: bool):
+    names = [n.upper() if rng.random() < 0.3 else n for n in SYLLABUS]
+    if not identical:
+        names = [f"{n} {student}" for n in names]
+    rng.shuffle(names)
+    return [{"name": n, "subject": "Physics", "level": "partial"} for n in names]
+
+
+async def run(app, identical: bool) -> None:
+    service = OllamaService()
+    service.base_url = f"http://127.0.0.1:{PORT}"
+    service.latency_budget = 60
+    service.start()
+
+    rng = random.Random(22)
+    requests_before = app.state.requests
+
+    async def one(student: int) -> float:
+        started = time.perf_counter()
+        result = await service.llm_initial_schedule(student_topics(rng, student, identical), 90)
+        assert result and sum(item["time_minutes"] for item in result) == 90
+        return time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(one(i) for i in range(STUDENTS))))
+        wall = time.perf_counter() - started
+    finally:
+        await service.close()
+
+    label = "same syllabus" if identical else "distinct"
+    print(f"{label:<14} generations {app.state.requests - requests_before:>3}   deduplicated {service.deduplicated:>3}"
+          f"   p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms   wall {wall * 1000:6.0f} ms")
+
+
+async def main(app) -> None:
+    allocation_cache.enabled = False
+    print(f"{STUDENTS} concurrent allocations")
+    await run(app, identical=False)
+    await run(app, identical=True)
+
+
+if __name__ == "__main__":
+    server, app = start_fake_ollama()
+    asyncio.run(main(app))
+    server.should_exit = True
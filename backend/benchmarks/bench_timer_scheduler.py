@@ -0,0 +1,118 @@
+"""
+Cost of keeping a deadline for every running topic in the timer scheduler
+at tens of thousands of sessions: scheduling, the cancel/reschedule churn
+of pauses and resumes, and how late deadlines fire. For comparison, the
+per-tick cost of the alternative, a loop that polls every session's
+remaining time once a second.
+
+    cd backend && python benchmarks/bench_timer_scheduler.py
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from models.schemas import Session, SessionState, Topic  # noqa: E402
+from services.timer_scheduler import TimerScheduler  # noqa: E402
+from services.timer_service import TimerService  # noqa: E402
+
+SIZES = (10_000, 50_000)
+CHURN = 100_000  # pause/resume pairs
+FIRE_COUNT = 20_000
+FIRE_SPREAD_SECONDS = 2.0
+POLL_SESSIONS = 10_000
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def bench_operations(size: int):
+    rng = random.Random(size)
+    scheduler = TimerScheduler()
+    keys = [f"session-{i}" for i in range(size)]
+
+    started = time.perf_counter()
+    for key in keys:
+        scheduler.schedule(key, rng.uniform(60, 3600))
+    schedule_us = (time.perf_counter() - started) / size * 1e6
+
+    started = time.perf_counter()
+    for _ in range(CHURN):
+        key = rng.choice(keys)
+        scheduler.cancel(key)
+        scheduler.schedule(key, rng.uniform(60, 3600))
+    churn_us = (time.perf_counter() - started) / CHURN * 1e6
+
+    print(f"  {size:>6} timers: schedule {schedule_us:.2f} us, pause + resume {churn_us:.2f} us,"
+          f" heap {len(scheduler._heap)} entries for {len(scheduler)} live")
+
+
+async def bench_firing():
+    scheduler = TimerScheduler()
+    rng = random.Random(7)
+    due = {}
+    lags = []
+
+    def on_expire(key: str) -> None:
+        lags.append(time.monotonic() - due[key])
+
+    scheduler.start(on_expire)
+    for i in range(FIRE_COUNT):
+        delay = rng.uniform(0.05, FIRE_SPREAD_SECONDS)
+        scheduler.schedule(str(i), delay)
+        due[str(i)] = time.monotonic() + delay
+
+    # Half the timers get cancelled and re-armed, as pauses and resumes would
+    for i in range(0, FIRE_COUNT, 2):
+        scheduler.cancel(str(i))
+        delay = rng.uniform(0.05, FIRE_SPREAD_SECONDS)
+        scheduler.schedule(str(i), delay)
+        due[str(i)] = time.monotonic() + delay
+
+    await asyncio.sleep(FIRE_SPREAD_SECONDS + 0.5)
+    scheduler.stop()
+
+    print(f"  {len(lags)}/{FIRE_COUNT} fired over {FIRE_SPREAD_SECONDS:.0f} s,"
+          f" lag p50 {percentile(lags, 0.5) * 1000:.2f} ms, p99 {percentile(lags, 0.99) * 1000:.2f} ms,"
+          f" max {max(lags) * 1000:.2f} ms")
+
+
+def bench_polling():
+    started_at = datetime.utcnow() - timedelta(minutes=5)
+    sessions = []
+    for i in range(POLL_SESSIONS):
+        session = Session(
+            session_id=str(i),
+            topics=[Topic(name="topic", subject="subject", level="unknown", time_minutes=30)],
+            state=SessionState.ACTIVE
+        )
+        session.timer_started_at = started_at
+        sessions.append(session)
+
+    started = time.perf_counter()
+    expired = [s for s in sessions if TimerService.get_remaining_seconds(s) == 0]
+    tick_ms = (time.perf_counter() - started) * 1000
+    print(f"  scanning {POLL_SESSIONS} sessions: {tick_ms:.1f} ms per tick ({len(expired)} expired),"
+          f" ~{tick_ms * 50_000 / POLL_SESSIONS:.0f} ms at 50000, and expiry is up to a tick late")
+
+
+def main():
+    print("heap operations")
+    for size in SIZES:
+        bench_operations(size)
+
+    print("firing")
+    asyncio.run(bench_firing())
+
+    print("polling every session once a second instead")
+    bench_polling()
+
+
+if __name__ == "__main__":
+    main()
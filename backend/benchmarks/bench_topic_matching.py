@@ -0,0 +1,100 @@
+"""
+Matching the topic names the LLM writes back onto the original topics: the
+old linear substring scan versus the indexed TopicMatcher.
+
+The simulated responses list every topic in shuffled order, with the kind of
+noise models produce: case changes, stray punctuation and an extra trailing
+word ("... basics"). A match is correct when it resolves to the
+topic the entry was written from; duplicates are topics claimed more than
+once, dropped are topics nothing resolved to.
+
+    cd backend && python benchmarks/bench_topic_matching.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.topic_matcher import TopicMatcher  # noqa: E402
+
+SIZES = (100, 500, 2000)
+WORDS = (
+    "algebra geometry calculus vectors matrices probability statistics optics "
+    "thermodynamics kinetics organic inorganic genetics ecology cells grammar "
+    "poetry essays history economics trade markets circuits signals waves"
+).split()
+
+
+def make_topics(rng: random.Random, count: int):
+    topics = []
+    for i in range(count):
+        # Numbered names are the worst case for substring matching ("Topic 1" in "Topic 10")
+        if i % 2:
+            name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}"
+        else:
+            name = f"Topic {i}"
+        topics.append({"name": name, "subject": "General", "level": "partial"})
+    return topics
+
+
+def llm_names(rng: random.Random, topics):
+    """(written name, index it was written from), shuffled"""
+    entries = []
+    for i, t in enumerate(topics):
+        name = t["name"]
+        roll = rng.random()
+        if roll < 0.25:
+            name = name.upper()
+        elif roll < 0.4:
+            name = f"{name} basics"
+        elif roll < 0.5:
+            name = f"{name}."
+        entries.append((name, i))
+    rng.shuffle(entries)
+    return entries
+
+
+def old_match(name, topics):
+    name = name.lower()
+    return next(
+        (i for i, t in enumerate(topics) if name in t["name"].lower() or t["name"].lower() in name),
+        None
+    )
+
+
+def run(label, match_all, topics, entries):
+    started = time.perf_counter()
+    matched = match_all(topics, entries)
+    elapsed = time.perf_counter() - started
+
+    correct = sum(1 for (_, truth), got in zip(entries, matched) if got == truth)
+    claimed = [got for got in matched if got is not None]
+    duplicates = len(claimed) - len(set(claimed))
+    dropped = len(topics) - len(set(claimed))
+    print(f"  {label:<10} {elapsed * 1000:>10.2f} ms  correct {correct:>5}/{len(entries)}"
+          f"  duplicates {duplicates:>4}  dropped {dropped:>4}")
+
+
+def old_all(topics, entries):
+    return [old_match(name, topics) for name, _ in entries]
+
+
+def indexed_all(topics, entries):
+    matcher = TopicMatcher(topics)
+    return [matcher.assign(name) for name, _ in entries]
+
+
+def main():
+    rng = random.Random(19)
+    for size in SIZES:
+        topics = make_topics(rng, size)
+        entries = llm_names(rng, topics)
+        print(f"{size} topics")
+        run("substring", old_all, topics, entries)
+        run("indexed", indexed_all, topics, entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Stand-in for a local Ollama server, for exercising the backend without a
+GPU or a model download. It understands the allocation prompt the backend
+sends and answers with an equal split of the requested minutes.
+
+    cd backend && python benchmarks/fake_ollama.py --port 11435 --latency-ms 300
+    OLLAMA_BASE_URL=http://localhost:11435 python main.py
+
+/api/generate honours "stream" like the real server: NDJSON token chunks
+(one every --token-delay-ms) followed by a final "done" chunk with timings.
+It also honours "keep_alive" (default 5m): a request that finds the model
+unloaded pays --load-ms first, and a request without a prompt only loads it.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+TOPIC_LINE = re.compile(r"^- (.+?) → (.+) \((\w+)\)$", re.MULTILINE)
+TOTAL_LINE = re.compile(r"Total available time: (\d+) minutes")
+TOKEN_CHARS = 4
+DURATION = re.compile(r"^(-?\d+(?:\.\d+)?)(ms|s|m|h)?$")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+
+def keep_alive_seconds(value: Any) -> float:
+    """Ollama accepts a number of seconds or a duration string; negative means forever"""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = DURATION.match(str(value or "5m").strip())
+        seconds = float(match.group(1)) * DURATION_UNITS[match.group(2)] if match else 300
+    return float("inf") if seconds < 0 else seconds
+
+
+def build_schedule(prompt: str) -> Dict[str, Any]:
+    names = [match.group(2) for match in TOPIC_LINE.finditer(prompt)]
+    total_match = TOTAL_LINE.search(prompt)
+    total = int(total_match.group(1)) if total_match else 60
+
+    if not names:
+        return {"schedule": []}
+
+    base, extra = divmod(total, len(names))
+    return {
+        "schedule": [
+            {"name": name, "time_minutes": base + (1 if i < extra else 0)}
+            for i, name in enumerate(names)
+        ]
+    }
+
+
+def create_app(
+    model: str = "qwen2.5:7b",
+    latency_ms: float = 0,
+    token_delay_ms: float = 0,
+    load_ms: float = 0
+) -> FastAPI:
+    """latency_ms stands in for prompt evaluation, token_delay_ms for generation, load_ms for a cold start"""
+    app = FastAPI(title="Fake Ollama")
+    app.state.requests = 0
+    app.state.loads = 0
+    app.state.loaded_until = 0.0
+
+    def is_loaded() -> bool:
+        return time.monotonic() < app.state.loaded_until
+
+    async def ensure_loaded(body: Dict[str, Any]) -> int:
+        """Load the model if needed and extend its residency; returns the load time in ns"""
+        load_ns = 0
+        if not is_loaded():
+            started = time.perf_counter_ns()
+            await asyncio.sleep(load_ms / 1000)
+            app.state.loads += 1
+            load_ns = time.perf_counter_ns() - started
+        app.state.loaded_until = time.monotonic() + keep_alive_seconds(body.get("keep_alive"))
+        return load_ns
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": model, "model": model}]}
+
+    @app.get("/api/ps")
+    async def running():
+        if not is_loaded():
+            return {"models": []}
+        return {"models": [{"name": model, "model": model}]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        load_ns = await ensure_loaded(body)
+        if not body.get("prompt"):
+            return {"model": body.get("model", model), "response": "", "done": True, "done_reason": "load"}
+
+        started = time.perf_counter_ns()
+
+        text = json.dumps(build_schedule(body.get("prompt", "")))
+        tokens: List[str] = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+
+        await asyncio.sleep(latency_ms / 1000)
+        prompt_eval_ns = time.perf_counter_ns() - started
+
+        def final_chunk(response: str) -> Dict[str, Any]:
+            total_ns = time.perf_counter_ns() - started
+            return {
+                "model": body.get("model", model),
+                "response": response,
+                "done": True,
+                "total_duration": total_ns + load_ns,
+                "load_duration": load_ns,
+                "prompt_eval_count": len(body.get("prompt", "")) // TOKEN_CHARS,
+                "prompt_eval_duration": prompt_eval_ns,
+                "eval_count": len(tokens),
+                "eval_duration": total_ns - prompt_eval_ns
+            }
+
+        if not body.get("stream", True):
+            await asyncio.sleep(len(tokens) * token_delay_ms / 1000)
+            return final_chunk(text)
+
+        async def stream():
+            for token in tokens:
+                await asyncio.sleep(token_delay_ms / 1000)
+                yield json.dumps({"model": body.get("model", model), "response": token, "done": False}) + "\n"
+            yield json.dumps(final_chunk("")) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", default="qwen2.5:7b")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--token-delay-ms", type=float, default=0)
+    parser.add_argument("--load-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.model, args.latency_ms, args.token_delay_ms, args.load_ms),
+        host="127.0.0.1",
+        port=args.port
+    )
@@ -15,14 +15,79 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "qwen2.5:7b"
     OLLAMA_TIMEOUT: int = 30
+    OLLAMA_CONNECT_TIMEOUT: int = 5
+    OLLAMA_STREAMING: bool = True  # parse the schedule while it is being generated
+    OLLAMA_MAX_CONNECTIONS: int = 10
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 5
+    OLLAMA_HEALTH_INTERVAL_SECONDS: int = 10
+    OLLAMA_HEALTH_MAX_BACKOFF_SECONDS: int = 120  # longest gap between probes while Ollama is down
+    OLLAMA_ALLOCATION_BUDGET_SECONDS: float = 8  # give up on the LLM and allocate locally after this
+    OLLAMA_KEEP_ALIVE: str = "30m"  # duration ("30m") or plain seconds the model stays loaded after a call; negative keeps it forever
+    OLLAMA_KEEP_WARM_INTERVAL_SECONDS: int = 300  # idle time before pinging the model while sessions are live, 0 disables
+
+    # Time Allocation
+    ALLOCATION_MODE: str = "llm"  # "llm", or "local" for the weighted engine only
+
+    # Allocation Cache
+    ALLOCATION_CACHE_ENABLED: bool = True
+    ALLOCATION_CACHE_SIZE: int = 256
+    ALLOCATION_CACHE_TTL_SECONDS: int = 604800  # one week
+    ALLOCATION_CACHE_PATH: str = ""  # JSON file to persist entries to, empty keeps them in memory
+
+    # LLM Circuit Breaker
+    LLM_BREAKER_WINDOW: int = 20  # recent calls the rates are computed over
+    LLM_BREAKER_MIN_CALLS: int = 5
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 6
+    LLM_BREAKER_SLOW_CALL_RATE: float = 0.8
+    LLM_BREAKER_COOLDOWN_SECONDS: int = 30
     
     # Emotion Detection
     EMOTION_DETECTION_ENABLED: bool = True
     EMOTION_BUFFER_SIZE: int = 3
     NEGATIVE_EMOTIONS: str = "sad,tired"
+    EMOTION_EMA_ALPHA: float = 0.3  # weight of the newest frame in the smoothed probabilities
+    EMOTION_DETECTOR_BACKEND: str = "opencv"
+    EMOTION_DETECT_MIN_SIDE: int = 240  # px kept on the short side when decoding for the detector
+    MAX_FRAME_BYTES: int = 2_000_000
+
+    # Adaptive Capture
+    ADAPTIVE_CAPTURE_ENABLED: bool = True
+    CAPTURE_INTERVAL_MS: int = 3000  # before there is data, or with adaptive capture off
+    CAPTURE_INTERVAL_MIN_MS: int = 1000  # close to a break trigger
+    CAPTURE_INTERVAL_MAX_MS: int = 15000  # steady, non-negative emotions
+
+    # Face Tracking
+    FACE_TRACK_ENABLED: bool = True
+    FACE_TRACK_REDETECT_INTERVAL: int = 10  # frames between forced full detections
+    FACE_TRACK_MIN_CONFIDENCE: float = 0.6
+
+    # Duplicate Frame Detection
+    FRAME_DEDUP_ENABLED: bool = True
+    FRAME_DEDUP_THRESHOLD: float = 0.02  # mean abs thumbnail difference, 0-1
+
+    # Inference Engine
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_QUEUE_SIZE: int = 16  # max batches queued or in flight
+    EMOTION_BATCH_MAX_SIZE: int = 8
+    EMOTION_BATCH_MAX_WAIT_MS: int = 20
     
+    # Server
+    WEB_WORKERS: int = 1  # uvicorn worker processes when run via main.py
+
+    # Session Storage
+    SESSION_BACKEND: str = "memory"  # "memory", "sqlite" or "redis" (shared by all workers)
+    SESSION_DB_PATH: str = "mindtrack.db"
+    SESSION_FLUSH_INTERVAL_MS: int = 200
+    SESSION_FLUSH_MAX_BATCH: int = 256  # dirty sessions that force an early flush
+    SESSION_REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_MUTATE_RETRIES: int = 5  # attempts before a contended update gives up with 409
+
     # Timer
     TIMER_UPDATE_INTERVAL: int = 1  # seconds
+    TOPIC_AUTO_ADVANCE: bool = False  # complete a topic server-side once its time is up
+    TOPIC_AUTO_ADVANCE_GRACE_SECONDS: int = 15  # left for the client to complete it first
+    SSE_KEEPALIVE_SECONDS: int = 15
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -2,19 +2,64 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
+import asyncio
 import traceback
 
 from config.settings import settings
 from routes import sessions, emotions, reschedule
+from services.inference_engine import inference_engine
+from services.emotion_batcher import emotion_batcher
+from services.face_tracker import face_tracker
+from services.frame_dedup import frame_deduplicator
+from services.stream_metrics import stream_metrics
+from services.event_bus import event_bus
+from services.session_store import session_store
+from services.model_registry import model_registry
+from services.ollama_service import ollama_service
+from services.allocation_cache import allocation_cache
+from services.ollama_monitor import ollama_monitor
+from services.schedule_refiner import schedule_refiner
+from services.topic_expiry import topic_expiry
 from utils.exceptions import MindTrackException
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background resources with the app"""
+    restored = session_store.restore()
+    if restored and settings.DEBUG:
+        print(f"Restored {restored} sessions from {settings.SESSION_BACKEND} storage")
+    event_bus.start()
+    topic_expiry.start()
+    allocation_cache.load()
+    ollama_service.start()
+    ollama_monitor.start()
+    inference_engine.start()
+    # Warm in the background so /health can report "not ready" meanwhile
+    warm_up_task = asyncio.create_task(model_registry.warm_up(inference_engine))
+    yield
+    warm_up_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up_task
+    inference_engine.shutdown()
+    await topic_expiry.stop()
+    event_bus.stop()
+    await ollama_monitor.stop()
+    await schedule_refiner.stop()
+    await ollama_service.close()
+    allocation_cache.flush()
+    session_store.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     description="Backend API for MindTrack - Intelligent Study Session Manager",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # CORS Middleware
@@ -98,7 +143,19 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint, 503 until the emotion models are warm"""
+    if not model_registry.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "not ready",
+                "detail": model_registry.error or "Emotion models are warming up",
+                "timestamp": datetime.utcnow().isoformat(),
+                "app": settings.APP_NAME,
+                "version": settings.VERSION
+            }
+        )
+
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -114,17 +171,37 @@ async def get_api_info():
         "app_name": settings.APP_NAME,
         "version": settings.VERSION,
         "ollama_model": settings.OLLAMA_MODEL,
+        "allocation_mode": settings.ALLOCATION_MODE,
+        "ollama": ollama_monitor.get_status(),
+        "llm": ollama_service.get_stats(),
+        "allocation_cache": allocation_cache.get_stats(),
+        "schedule_refinement": schedule_refiner.get_stats(),
+        "topic_timers": topic_expiry.get_stats(),
         "emotion_detection": settings.EMOTION_DETECTION_ENABLED,
         "emotion_buffer_size": settings.EMOTION_BUFFER_SIZE,
-        "negative_emotions": settings.negative_emotions_list
+        "negative_emotions": settings.negative_emotions_list,
+        "sessions": await session_store.aget_stats(),
+        "inference": inference_engine.get_stats(),
+        "batching": emotion_batcher.get_stats(),
+        "face_tracking": face_tracker.get_stats(),
+        "frame_dedup": frame_deduplicator.get_stats(),
+        "streams": stream_metrics.get_stats(),
+        "events": event_bus.get_stats(),
+        "models": model_registry.get_status()
     }
 
 
 if __name__ == "__main__":
     import uvicorn
+
+    if settings.WEB_WORKERS > 1 and settings.SESSION_BACKEND.lower() != "redis":
+        raise SystemExit("WEB_WORKERS > 1 needs SESSION_BACKEND=redis so workers share sessions")
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        workers=settings.WEB_WORKERS,
+        # uvicorn cannot reload and fork workers at the same time
+        reload=settings.DEBUG and settings.WEB_WORKERS == 1
     )
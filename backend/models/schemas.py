@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PlainSerializer, PlainValidator, model_validator, validator
+from typing import Annotated, List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -20,6 +20,10 @@ class SessionState(str, Enum):
     COMPLETED = "completed"
 
 
+# States in which a session still belongs to its user as "the current one"
+LIVE_STATES = {SessionState.ACTIVE, SessionState.PAUSED, SessionState.RESCHEDULING}
+
+
 class EmotionType(str, Enum):
     NEUTRAL = "neutral"
     HAPPY = "happy"
@@ -100,7 +104,9 @@ class SessionSummaryResponse(BaseModel):
     total_time_minutes: int
     time_studied_minutes: int
     reschedule_count: int
-    emotions_timeline: List[EmotionType]
+    emotions_timeline: List[EmotionType]  # every emotion detected in the session
+    emotion_timestamps: List[datetime] = []
+    emotion_distribution: Dict[str, int] = {}
     backlog_topics: List[Dict[str, str]]
     created_at: datetime
     completed_at: Optional[datetime]
@@ -111,6 +117,8 @@ class SessionCreateResponse(BaseModel):
     message: str
     total_topics: int
     total_time_minutes: int
+    # Set when the LLM is refining the schedule in the background
+    refinement_job_id: Optional[str] = None
 
 
 class RescheduleResponse(BaseModel):
@@ -133,6 +141,25 @@ class ErrorResponse(BaseModel):
 
 
 # ===== INTERNAL DATA MODELS =====
+# The timeline lives in services/emotion_timeline.py, which needs the enums
+# above; import it lazily to keep the models importable on their own
+def _new_timeline():
+    from services.emotion_timeline import EmotionTimeline
+    return EmotionTimeline()
+
+
+def _validate_timeline(value: Any):
+    from services.emotion_timeline import EmotionTimeline
+    return EmotionTimeline.validate(value)
+
+
+EmotionTimelineField = Annotated[
+    Any,
+    PlainValidator(_validate_timeline),
+    PlainSerializer(lambda timeline: timeline.to_dict())
+]
+
+
 class Topic(BaseModel):
     name: str
     subject: str
@@ -146,16 +173,36 @@ class Topic(BaseModel):
 
 class Session(BaseModel):
     session_id: str
+    user_id: str = "default"
+    version: int = 0  # bumped on every write, for compare-and-swap updates
     topics: List[Topic]
     current_topic_index: int = 0
     state: SessionState = SessionState.IDLE
     timer_started_at: Optional[datetime] = None
-    emotions_buffer: List[EmotionType] = []
+    emotion_timeline: EmotionTimelineField = Field(default_factory=_new_timeline)
+    # Moving averages of the detector's probabilities and of how much they change per frame
+    emotion_probabilities: Dict[str, float] = {}
+    emotion_drift: float = 0.0
     backlog: List[Dict[str, str]] = []
     reschedule_count: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def _migrate_emotions_buffer(cls, data: Any) -> Any:
+        # Sessions stored before the timeline kept a plain list
+        if isinstance(data, dict) and "emotions_buffer" in data:
+            data = dict(data)
+            buffer = data.pop("emotions_buffer")
+            data.setdefault("emotion_timeline", buffer)
+        return data
+
+    @property
+    def emotions_buffer(self) -> List[EmotionType]:
+        """The trigger window, as the old capped list"""
+        return self.emotion_timeline.window()
+
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
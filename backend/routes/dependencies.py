@@ -0,0 +1,20 @@
+from typing import Optional
+
+from fastapi import Header, Query
+
+
+DEFAULT_CLIENT_ID = "default"
+MAX_CLIENT_ID_LENGTH = 64
+
+
+async def get_client_id(
+    x_client_id: Optional[str] = Header(None),
+    client_id: Optional[str] = Query(None)
+) -> str:
+    """
+    Identity of the caller that sessions are scoped to: the X-Client-Id
+    header, or ?client_id= for EventSource/WebSocket clients that cannot set
+    headers. Callers sending neither share the default identity.
+    """
+    value = (x_client_id or client_id or "").strip()
+    return value[:MAX_CLIENT_ID_LENGTH] or DEFAULT_CLIENT_ID
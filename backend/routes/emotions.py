@@ -1,35 +1,101 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, WebSocket, WebSocketDisconnect
 
+from config.settings import settings
 from models.schemas import EmotionStatusResponse
 from services.session_store import session_store
 from services.emotion_service import emotion_service
-from utils.exceptions import SessionNotFoundException
+from services.capture_pacer import capture_pacer
+from services.face_tracker import face_tracker
+from services.stream_metrics import stream_metrics
+from services.session_events import publish_session_event
+from routes.dependencies import get_client_id
+from utils.exceptions import SessionNotFoundException, FrameTooLargeException
 
 router = APIRouter(prefix="/api/emotions", tags=["Emotions"])
 
 
+async def _analyze_frame(image_bytes: bytes, client_id: str) -> dict:
+    session = await session_store.aget_active_session(client_id)
+    if not session:
+        raise SessionNotFoundException("active")
+
+    emotion, probabilities, cached = await emotion_service.classify_frame(session.session_id, image_bytes)
+
+    # Inference awaited, so apply the result to the latest stored state atomically
+    session = await session_store.amutate(
+        session.session_id,
+        lambda current: emotion_service.add_emotion(current, emotion, probabilities)
+    )
+    trigger, msg = emotion_service.check_trigger(session)
+
+    if trigger:
+        publish_session_event(session, "emotion_trigger", message=msg)
+
+    return {
+        "emotion": emotion,
+        "trigger_ready": trigger,
+        "message": msg,
+        "cached": cached,
+        "buffer": [e.value for e in session.emotions_buffer],
+        "probabilities": session.emotion_probabilities or None,
+        "next_capture_ms": capture_pacer.next_interval_ms(session)
+    }
+
+
+async def _read_frame_body(request: Request) -> bytes:
+    """Read the raw request body, aborting as soon as it passes MAX_FRAME_BYTES"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FRAME_BYTES:
+        raise FrameTooLargeException(settings.MAX_FRAME_BYTES)
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.MAX_FRAME_BYTES:
+            raise FrameTooLargeException(settings.MAX_FRAME_BYTES)
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+
 @router.post("/detect")
-async def detect_emotion(file: UploadFile = File(...)):
+async def detect_emotion(file: UploadFile = File(...), client_id: str = Depends(get_client_id)):
     """
     Backend emotion detection from uploaded webcam frame
     """
     try:
-        session = session_store.get_active_session()
-        if not session:
-            raise SessionNotFoundException("active")
+        image_bytes = await file.read(settings.MAX_FRAME_BYTES + 1)
+        if len(image_bytes) > settings.MAX_FRAME_BYTES:
+            raise FrameTooLargeException(settings.MAX_FRAME_BYTES)
 
-        image_bytes = await file.read()
+        return await _analyze_frame(image_bytes, client_id)
 
-        trigger, msg, emotion = emotion_service.process_frame(session, image_bytes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to detect emotion: {str(e)}"
+        )
 
-        session_store.update_session(session.session_id, session)
 
-        return {
-            "emotion": emotion,
-            "trigger_ready": trigger,
-            "message": msg,
-            "buffer": [e.value for e in session.emotions_buffer]
-        }
+@router.post("/detect/raw")
+async def detect_emotion_raw(request: Request, client_id: str = Depends(get_client_id)):
+    """
+    Emotion detection from a raw image/jpeg body (skips multipart parsing)
+    """
+    try:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if content_type != "image/jpeg":
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Expected an image/jpeg request body"
+            )
+
+        image_bytes = await _read_frame_body(request)
+
+        return await _analyze_frame(image_bytes, client_id)
 
     except HTTPException:
         raise
@@ -40,13 +106,54 @@ async def detect_emotion(file: UploadFile = File(...)):
         )
 
 
+@router.websocket("/stream")
+async def stream_emotions(websocket: WebSocket, client_id: str = Depends(get_client_id)):
+    """
+    Persistent frame stream: the client sends binary JPEG frames, the server
+    answers each one with the same payload as /detect
+    """
+    await websocket.accept()
+    stream_metrics.connected("emotion_stream")
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            frame = message.get("bytes")
+            if frame is None:
+                continue
+            stream_metrics.received("emotion_stream")
+
+            try:
+                if len(frame) > settings.MAX_FRAME_BYTES:
+                    raise FrameTooLargeException(settings.MAX_FRAME_BYTES)
+                payload = await _analyze_frame(frame, client_id)
+            except HTTPException as e:
+                payload = {"error": e.detail, "status_code": e.status_code}
+            except Exception as e:
+                payload = {
+                    "error": f"Failed to detect emotion: {str(e)}",
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR
+                }
+
+            await websocket.send_json(payload)
+            stream_metrics.sent("emotion_stream")
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_metrics.disconnected("emotion_stream")
+
+
 @router.get("/status", response_model=EmotionStatusResponse)
-async def get_emotion_status():
+async def get_emotion_status(client_id: str = Depends(get_client_id)):
     """
     Check if break trigger condition is met
     """
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise SessionNotFoundException("active")
 
@@ -65,3 +172,24 @@ async def get_emotion_status():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get emotion status: {str(e)}"
         )
+
+
+@router.get("/tracking")
+async def get_tracking_stats(client_id: str = Depends(get_client_id)):
+    """
+    Face tracking cache hit-rate for the active session
+    """
+    try:
+        session = await session_store.aget_active_session(client_id)
+        if not session:
+            raise SessionNotFoundException("active")
+
+        return face_tracker.get_session_stats(session.session_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get tracking stats: {str(e)}"
+        )
@@ -1,35 +1,64 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Dict, Any
 
 from models.schemas import (
-    RescheduleResponse, SessionState, TopicStatus, Topic
+    RescheduleResponse, Session, SessionState, TopicStatus, Topic
 )
 from services.session_store import session_store
 from services.ollama_service import ollama_service
+from services.ollama_monitor import ollama_monitor
 from services.timer_service import TimerService
 from services.emotion_service import emotion_service
-from utils.exceptions import SessionNotFoundException, InvalidSessionStateException, OllamaException
+from services.session_events import publish_session_event
+from services.topic_expiry import topic_expiry
+from services.allocation_cache import allocation_cache
+from routes.dependencies import get_client_id
+from utils.exceptions import (
+    SessionNotFoundException, SessionConflictException, InvalidSessionStateException, OllamaException
+)
 
 router = APIRouter(prefix="/api/reschedule", tags=["Reschedule"])
 
 
-@router.post("/trigger", response_model=RescheduleResponse)
-async def trigger_reschedule():
-    try:
-        session = session_store.get_active_session()
-        if not session:
-            raise SessionNotFoundException("active")
+async def _abort_reschedule(session_id: str) -> None:
+    """Hand the session back to the student if the reschedule did not finish"""
+    def abort(current: Session) -> None:
+        if current.state == SessionState.RESCHEDULING:
+            current.state = SessionState.ACTIVE
+            TimerService.resume_timer(current)
 
-        TimerService.pause_timer(session)
-        session.state = SessionState.RESCHEDULING
-        session_store.update_session(session.session_id, session)
+    try:
+        topic_expiry.sync(await session_store.amutate(session_id, abort))
+    except (SessionNotFoundException, SessionConflictException):
+        pass
 
-        remaining_topics: List[Topic] = []
-        current_index = session.current_topic_index
 
-        for i, topic in enumerate(session.topics):
-            if i >= current_index and topic.status in [TopicStatus.PENDING, TopicStatus.ACTIVE]:
-                remaining_topics.append(topic)
+@router.post("/trigger", response_model=RescheduleResponse)
+async def trigger_reschedule(client_id: str = Depends(get_client_id)):
+    session = await session_store.aget_active_session(client_id)
+    if not session:
+        raise SessionNotFoundException("active")
+
+    session_id = session.session_id
+    remaining_topics: List[Topic] = []
+    remaining_time = 0
+
+    # Phase 1: freeze the session. The LLM call below can take seconds, so
+    # no session state is held across it; other requests keep writing and
+    # phase 2 applies the result to whatever is current by then.
+    def begin(current: Session) -> None:
+        nonlocal remaining_topics, remaining_time
+
+        if current.state == SessionState.RESCHEDULING:
+            raise InvalidSessionStateException(current.state.value, "active")
+
+        TimerService.pause_timer(current)
+
+        remaining_topics = [
+            topic for i, topic in enumerate(current.topics)
+            if i >= current.current_topic_index
+            and topic.status in [TopicStatus.PENDING, TopicStatus.ACTIVE]
+        ]
 
         if not remaining_topics:
             raise HTTPException(
@@ -37,8 +66,8 @@ async def trigger_reschedule():
                 detail="No remaining topics to reschedule"
             )
 
-        total_allocated = sum(t.time_minutes for t in session.topics)
-        time_used = TimerService.get_total_studied_time(session)
+        total_allocated = sum(t.time_minutes for t in current.topics)
+        time_used = TimerService.get_total_studied_time(current)
         remaining_time = max(0, total_allocated - time_used)
 
         if remaining_time < 5:
@@ -47,6 +76,11 @@ async def trigger_reschedule():
                 detail="Not enough time remaining for rescheduling (minimum 5 minutes required)"
             )
 
+        current.state = SessionState.RESCHEDULING
+
+    topic_expiry.sync(await session_store.amutate(session_id, begin))
+
+    try:
         old_schedule = [
             {
                 "name": t.name,
@@ -57,27 +91,37 @@ async def trigger_reschedule():
             for t in remaining_topics
         ]
 
-        if not ollama_service.check_connection():
+        if not ollama_monitor.available:
             raise OllamaException("Ollama is not running or not accessible")
 
-        new_schedule = ollama_service.reschedule_topics(remaining_topics, remaining_time)
+        new_schedule = await ollama_service.reschedule_topics(remaining_topics, remaining_time)
 
         topic_name_to_new_time = {
             item["name"]: item["time_minutes"]
             for item in new_schedule
         }
 
-        for topic in remaining_topics:
-            if topic.name in topic_name_to_new_time:
-                topic.time_minutes = topic_name_to_new_time[topic.name]
+        # Phase 2: apply the new times to topics that are still open
+        def apply(current: Session) -> None:
+            for i, topic in enumerate(current.topics):
+                if (
+                    i >= current.current_topic_index
+                    and topic.status in [TopicStatus.PENDING, TopicStatus.ACTIVE]
+                    and topic.name in topic_name_to_new_time
+                ):
+                    topic.time_minutes = topic_name_to_new_time[topic.name]
+
+            emotion_service.clear_buffer(current)
 
-        emotion_service.clear_buffer(session)
+            current.reschedule_count += 1
 
-        session.reschedule_count += 1
+            if current.state == SessionState.RESCHEDULING:
+                current.state = SessionState.ACTIVE
+                TimerService.resume_timer(current)
 
-        session.state = SessionState.ACTIVE
-        TimerService.resume_timer(session)
-        session_store.update_session(session.session_id, session)
+        session = await session_store.amutate(session_id, apply)
+        topic_expiry.sync(session)
+        publish_session_event(session, "rescheduled", new_schedule=new_schedule)
 
         return RescheduleResponse(
             message="Schedule updated successfully",
@@ -87,30 +131,16 @@ async def trigger_reschedule():
         )
 
     except HTTPException:
+        await _abort_reschedule(session_id)
         raise
     except OllamaException as e:
-        try:
-            session = session_store.get_active_session()
-            if session:
-                session.state = SessionState.ACTIVE
-                TimerService.resume_timer(session)
-                session_store.update_session(session.session_id, session)
-        except:
-            pass
+        await _abort_reschedule(session_id)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=str(e)
         )
     except Exception as e:
-        try:
-            session = session_store.get_active_session()
-            if session:
-                session.state = SessionState.ACTIVE
-                TimerService.resume_timer(session)
-                session_store.update_session(session.session_id, session)
-        except:
-            pass
-
+        await _abort_reschedule(session_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to reschedule: {str(e)}"
@@ -119,19 +149,24 @@ async def trigger_reschedule():
 
 @router.get("/check-ollama")
 async def check_ollama_status():
+    """
+    Last status seen by the background monitor; never probes Ollama itself
+    """
     try:
-        is_running = ollama_service.check_connection()
+        health = ollama_monitor.get_status()
 
-        if is_running:
+        if ollama_monitor.available:
             return {
                 "status": "connected",
                 "message": "Ollama is running",
-                "model": ollama_service.model
+                "model": ollama_service.model,
+                **health
             }
         else:
             return {
                 "status": "disconnected",
-                "message": "Ollama is not running or not accessible"
+                "message": "Ollama is not running or not accessible",
+                **health
             }
 
     except Exception as e:
@@ -139,3 +174,19 @@ async def check_ollama_status():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to check Ollama: {str(e)}"
         )
+
+
+@router.delete("/allocation-cache")
+async def invalidate_allocation_cache():
+    """
+    Forget all cached schedule allocations, e.g. after changing the prompt
+    """
+    try:
+        cleared = allocation_cache.invalidate()
+        return {"message": "Allocation cache cleared", "cleared": cleared}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to clear allocation cache: {str(e)}"
+        )
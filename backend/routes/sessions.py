@@ -1,14 +1,28 @@
-from fastapi import APIRouter, HTTPException, status
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 
 from models.schemas import (
     SessionCreateRequest, SessionCreateResponse, CurrentTopicResponse,
-    TopicCompletionRequest, SessionSummaryResponse, TopicResponse,
+    TopicCompletionRequest, SessionSummaryResponse,
     Session, Topic, TopicStatus, SessionState
 )
 from services.session_store import session_store
 from services.timer_service import TimerService
-from services.ollama_service import ollama_service
+from services.topic_expiry import topic_expiry
+from services.allocation_engine import allocation_engine, backlog_keys
+from services.ollama_monitor import ollama_monitor
+from services.schedule_refiner import schedule_refiner
+from services.face_tracker import face_tracker
+from services.frame_dedup import frame_deduplicator
+from services.event_bus import event_bus
+from services.session_events import (
+    TERMINAL_EVENTS, publish_session_event, session_snapshot, topic_response
+)
+from services.stream_metrics import stream_metrics
+from config.settings import settings
+from routes.dependencies import get_client_id
 from utils.exceptions import (
     SessionNotFoundException, InvalidSessionStateException, NoActiveTopicException
 )
@@ -17,9 +31,9 @@ router = APIRouter(prefix="/api/sessions", tags=["Sessions"])
 
 
 @router.post("/create", response_model=SessionCreateResponse, status_code=status.HTTP_201_CREATED)
-async def create_session(request: SessionCreateRequest):
+async def create_session(request: SessionCreateRequest, client_id: str = Depends(get_client_id)):
     try:
-        active = session_store.get_active_session()
+        active = await session_store.aget_active_session(client_id)
         if active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,7 +50,7 @@ async def create_session(request: SessionCreateRequest):
                 flat_topics.append({
                     "name": t.name,
                     "subject": subject.name,
-                    "level": t.level
+                    "level": t.level.value
                 })
 
         if not flat_topics:
@@ -45,12 +59,24 @@ async def create_session(request: SessionCreateRequest):
                 detail="At least one topic required"
             )
 
+        if request.total_time_minutes < len(flat_topics):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Total time must give every topic at least one minute"
+            )
+
         # -------------------------
-        # 🔥 INITIAL LLM TIME ALLOCATION
+        # 🔥 INITIAL TIME ALLOCATION
         # -------------------------
-        allocated = ollama_service.allocate_initial_schedule(
+        previous = await session_store.aget_latest_session(client_id, SessionState.COMPLETED)
+        backlog = backlog_keys(previous.backlog) if previous else None
+
+        # The local engine answers at once; the LLM's view, if wanted,
+        # arrives later and only re-splits topics that have not started
+        allocated = allocation_engine.allocate(
             flat_topics,
-            request.total_time_minutes
+            request.total_time_minutes,
+            backlog
         )
 
         # -------------------------
@@ -70,20 +96,27 @@ async def create_session(request: SessionCreateRequest):
 
         session = Session(
             session_id="",
+            user_id=client_id,
             topics=topics,
             state=SessionState.ACTIVE
         )
 
-        session_id = session_store.create_session(session)
-
         TimerService.start_topic_timer(session, 0)
-        session_store.update_session(session_id, session)
+        session_id = await session_store.acreate_session(session)
+        topic_expiry.sync(session)
+
+        # Skip the LLM round trip entirely when the monitor knows it is down
+        refinement = None
+        if settings.ALLOCATION_MODE == "llm" and ollama_monitor.available and len(topics) > 1:
+            job = schedule_refiner.submit(session_id, flat_topics, request.total_time_minutes, backlog)
+            refinement = job.job_id
 
         return SessionCreateResponse(
             session_id=session_id,
             message="Session created successfully",
             total_topics=len(topics),
-            total_time_minutes=request.total_time_minutes
+            total_time_minutes=request.total_time_minutes,
+            refinement_job_id=refinement
         )
 
     except HTTPException:
@@ -96,9 +129,9 @@ async def create_session(request: SessionCreateRequest):
 
 
 @router.get("/current", response_model=CurrentTopicResponse)
-async def get_current_topic():
+async def get_current_topic(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
@@ -111,19 +144,8 @@ async def get_current_topic():
 
         remaining_seconds = TimerService.get_remaining_seconds(session)
 
-        topic_response = TopicResponse(
-            name=current_topic.name,
-            subject=current_topic.subject,
-            level=current_topic.level,
-            time_minutes=current_topic.time_minutes,
-            status=current_topic.status,
-            actual_time_spent=int(current_topic.actual_time_spent_seconds / 60),
-            started_at=current_topic.started_at,
-            completed_at=current_topic.completed_at
-        )
-
         return CurrentTopicResponse(
-            topic=topic_response,
+            topic=topic_response(current_topic),
             index=session.current_topic_index,
             total_topics=len(session.topics),
             timer_remaining_seconds=remaining_seconds,
@@ -139,43 +161,55 @@ async def get_current_topic():
         )
 
 
-@router.post("/topic/complete")
-async def complete_topic(request: TopicCompletionRequest):
+@router.get("/refinement")
+async def get_refinement_status(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise SessionNotFoundException("active")
 
-        current_topic = TimerService.get_current_topic(session)
-        if not current_topic:
-            raise NoActiveTopicException()
+        job = schedule_refiner.get_job(session.session_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No schedule refinement for this session"
+            )
 
-        TimerService.stop_timer(session)
+        return job.to_dict()
 
-        if request.completed:
-            current_topic.status = TopicStatus.COMPLETED
-            current_topic.completed_at = datetime.utcnow()
-        else:
-            current_topic.status = TopicStatus.BACKLOG
-            session.backlog.append({
-                "name": current_topic.name,
-                "subject": current_topic.subject
-            })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get refinement status: {str(e)}"
+        )
+
+
+@router.post("/topic/complete")
+async def complete_topic(request: TopicCompletionRequest, client_id: str = Depends(get_client_id)):
+    try:
+        session = await session_store.aget_active_session(client_id)
+        if not session:
+            raise SessionNotFoundException("active")
+
+        def advance(current: Session) -> None:
+            TimerService.advance_topic(current, request.completed)
 
-        session.current_topic_index += 1
+        session = await session_store.amutate(session.session_id, advance)
+        topic_expiry.sync(session)
 
-        if session.current_topic_index >= len(session.topics):
-            session.state = SessionState.COMPLETED
-            session.completed_at = datetime.utcnow()
-            session_store.update_session(session.session_id, session)
+        if session.state == SessionState.COMPLETED:
+            face_tracker.forget(session.session_id)
+            frame_deduplicator.forget(session.session_id)
+            publish_session_event(session, "session_completed")
 
             return {
                 "message": "Session completed",
                 "session_complete": True
             }
 
-        TimerService.start_topic_timer(session, session.current_topic_index)
-        session_store.update_session(session.session_id, session)
+        publish_session_event(session, "topic_changed")
 
         next_topic = session.topics[session.current_topic_index]
 
@@ -196,18 +230,22 @@ async def complete_topic(request: TopicCompletionRequest):
 
 
 @router.post("/pause")
-async def pause_session():
+async def pause_session(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise SessionNotFoundException("active")
 
-        if session.state != SessionState.ACTIVE:
-            raise InvalidSessionStateException(session.state.value, "active")
+        def pause(current: Session) -> None:
+            if current.state != SessionState.ACTIVE:
+                raise InvalidSessionStateException(current.state.value, "active")
 
-        TimerService.pause_timer(session)
-        session.state = SessionState.PAUSED
-        session_store.update_session(session.session_id, session)
+            TimerService.pause_timer(current)
+            current.state = SessionState.PAUSED
+
+        session = await session_store.amutate(session.session_id, pause)
+        topic_expiry.sync(session)
+        publish_session_event(session, "session_paused")
 
         return {"message": "Session paused"}
 
@@ -221,18 +259,22 @@ async def pause_session():
 
 
 @router.post("/resume")
-async def resume_session():
+async def resume_session(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise SessionNotFoundException("active")
 
-        if session.state != SessionState.PAUSED:
-            raise InvalidSessionStateException(session.state.value, "paused")
+        def resume(current: Session) -> None:
+            if current.state != SessionState.PAUSED:
+                raise InvalidSessionStateException(current.state.value, "paused")
+
+            TimerService.resume_timer(current)
+            current.state = SessionState.ACTIVE
 
-        TimerService.resume_timer(session)
-        session.state = SessionState.ACTIVE
-        session_store.update_session(session.session_id, session)
+        session = await session_store.amutate(session.session_id, resume)
+        topic_expiry.sync(session)
+        publish_session_event(session, "session_resumed")
 
         return {"message": "Session resumed"}
 
@@ -246,18 +288,16 @@ async def resume_session():
 
 
 @router.get("/summary", response_model=SessionSummaryResponse)
-async def get_session_summary():
+async def get_session_summary(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
-            all_sessions = session_store.get_all_sessions()
-            completed = [s for s in all_sessions.values() if s.state == SessionState.COMPLETED]
-            if not completed:
+            session = await session_store.aget_latest_session(client_id, SessionState.COMPLETED)
+            if not session:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="No session found"
                 )
-            session = max(completed, key=lambda s: s.created_at)
 
         completed_count = sum(1 for t in session.topics if t.status == TopicStatus.COMPLETED)
         total_time = sum(t.time_minutes for t in session.topics)
@@ -272,7 +312,9 @@ async def get_session_summary():
             total_time_minutes=total_time,
             time_studied_minutes=time_studied,
             reschedule_count=session.reschedule_count,
-            emotions_timeline=session.emotions_buffer,
+            emotions_timeline=session.emotion_timeline.history(),
+            emotion_timestamps=session.emotion_timeline.timestamps(),
+            emotion_distribution=session.emotion_timeline.distribution(),
             backlog_topics=session.backlog,
             created_at=session.created_at,
             completed_at=session.completed_at
@@ -288,13 +330,17 @@ async def get_session_summary():
 
 
 @router.delete("/delete")
-async def delete_session():
+async def delete_session(client_id: str = Depends(get_client_id)):
     try:
-        session = session_store.get_active_session()
+        session = await session_store.aget_active_session(client_id)
         if not session:
             raise SessionNotFoundException("active")
 
-        session_store.delete_session(session.session_id)
+        await session_store.adelete_session(session.session_id)
+        topic_expiry.forget(session.session_id)
+        face_tracker.forget(session.session_id)
+        frame_deduplicator.forget(session.session_id)
+        publish_session_event(session, "session_deleted")
         return {"message": "Session deleted successfully"}
 
     except HTTPException:
@@ -304,3 +350,48 @@ async def delete_session():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete session: {str(e)}"
         )
+
+
+@router.get("/events")
+async def stream_session_events(request: Request, client_id: str = Depends(get_client_id)):
+    """
+    Server-Sent Events feed of session state changes. Each event carries a
+    full snapshot, so clients run the countdown locally between pushes.
+    """
+    session = await session_store.aget_active_session(client_id)
+    if not session:
+        raise SessionNotFoundException("active")
+
+    session_id = session.session_id
+    queue = event_bus.subscribe(session_id)
+
+    def format_event(event: dict) -> str:
+        return f"data: {json.dumps(event)}\n\n"
+
+    async def event_stream():
+        stream_metrics.connected("session_events")
+        try:
+            yield format_event({"type": "state", "session": session_snapshot(session)})
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield format_event(event)
+                stream_metrics.sent("session_events")
+
+                if event["type"] in TERMINAL_EVENTS:
+                    break
+        finally:
+            event_bus.unsubscribe(session_id, queue)
+            stream_metrics.disconnected("session_events")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
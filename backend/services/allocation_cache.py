@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+# Puts within this long of each other reach the file in one write
+SAVE_DELAY_SECONDS = 1.0
+
+
+def _topic_key(topic: Dict[str, Any]) -> str:
+    return f"{topic['subject'].strip().casefold()}\x1f{topic['name'].strip().casefold()}"
+
+
+def canonical_proposal(proposal: Dict[int, int], topics: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+    """A proposal (topic index -> minutes) keyed by topic instead of position"""
+    return [(_topic_key(topics[i]), minutes) for i, minutes in proposal.items()]
+
+
+def proposal_for(items: List[Tuple[str, int]], topics: List[Dict[str, Any]]) -> Dict[int, int]:
+    """A canonical proposal back onto another spelling and order of the same topics"""
+    slots: Dict[str, List[int]] = {}
+    for i, t in enumerate(topics):
+        slots.setdefault(_topic_key(t), []).append(i)
+
+    proposal = {}
+    for topic_key, minutes in items:
+        free = slots.get(topic_key)
+        if free:
+            proposal[free.pop(0)] = minutes
+    return proposal
+
+
+class AllocationCache:
+    """
+    LRU + TTL memo of the LLM's raw schedule proposals. The key covers the
+    topic set (order and case insensitive), levels, total minutes, model
+    and prompt version. Entries store the model's minutes per canonical
+    topic, before reconciling, and are mapped back onto the caller's own
+    topics on a hit; each caller reconciles them with its own backlog. With a path set,
+    entries are written to a JSON file so they survive restarts; writes
+    are debounced and done off the event loop.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: int, path: str = ""):
+        self.enabled = enabled
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.path = path
+        # key -> (expires_at, [(topic key, minutes), ...])
+        self._entries: "OrderedDict[str, Tuple[float, List[Tuple[str, int]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def make_key(topics: List[Dict[str, Any]], total_minutes: int, model: str, prompt_version: int) -> str:
+        canonical = sorted(f"{_topic_key(t)}\x1f{t['level']}" for t in topics)
+        payload = json.dumps([canonical, total_minutes, model, prompt_version])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, topics: List[Dict[str, Any]]) -> Optional[Dict[int, int]]:
+        """The cached proposal as topic index -> minutes for these topics"""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return proposal_for(entry[1], topics)
+
+    def put(self, key: str, proposal: Dict[int, int], topics: List[Dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+
+        self._entries[key] = (time.time() + self.ttl, canonical_proposal(proposal, topics))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.save()
+
+    def invalidate(self) -> int:
+        """Drop every entry, e.g. after the allocation prompt changed"""
+        cleared = len(self._entries)
+        self._entries.clear()
+        self.save()
+        return cleared
+
+    def load(self) -> int:
+        if not (self.enabled and self.path and os.path.exists(self.path)):
+            return 0
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        now = time.time()
+        for key, (expires_at, items) in stored.items():
+            if expires_at > now:
+                self._entries[key] = (expires_at, [tuple(item) for item in items])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return len(self._entries)
+
+    def save(self) -> None:
+        """Persist the entries shortly, or right away outside the event loop"""
+        if not self.path:
+            return
+
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        # Loops so puts that land while a write is running are not lost
+        while self._dirty:
+            await asyncio.sleep(SAVE_DELAY_SECONDS)
+            self._dirty = False
+            await asyncio.to_thread(self._write, json.dumps(self._entries))
+
+    def flush(self) -> None:
+        """Write pending changes now, e.g. at shutdown"""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        if self._dirty and self.path:
+            self._dirty = False
+            self._write(json.dumps(self._entries))
+
+    def _write(self, data: str) -> None:
+        # Write-then-rename so a crash never leaves a half-written file; the
+        # temp name is unique so several workers never share one
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=directory,
+                prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+        except OSError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            if settings.DEBUG:
+                print(f"Could not persist allocation cache: {e}")
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": bool(self.path),
+            "writes": self.writes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+allocation_cache = AllocationCache(
+    enabled=settings.ALLOCATION_CACHE_ENABLED,
+    max_entries=settings.ALLOCATION_CACHE_SIZE,
+    ttl_seconds=settings.ALLOCATION_CACHE_TTL_SECONDS,
+    path=settings.ALLOCATION_CACHE_PATH
+)
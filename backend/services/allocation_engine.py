@@ -0,0 +1,137 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.schemas import TopicLevel
+
+
+# Same rules the LLM prompt states: UNKNOWN +20%, KNOWN -10%, PARTIAL as is
+LEVEL_WEIGHTS = {
+    TopicLevel.UNKNOWN: 1.2,
+    TopicLevel.PARTIAL: 1.0,
+    TopicLevel.KNOWN: 0.9
+}
+# Topics the student pushed to the backlog last time get a little more
+BACKLOG_BOOST = 1.1
+MIN_TOPIC_MINUTES = 5
+
+
+def backlog_keys(backlog: List[Dict[str, str]]) -> Set[Tuple[str, str]]:
+    """(subject, name) pairs of a session backlog, for the backlog signal"""
+    return {
+        (item.get("subject", "").strip().casefold(), item.get("name", "").strip().casefold())
+        for item in backlog
+    }
+
+
+class AllocationEngine:
+    """Deterministic weighted time allocation, exact to the minute"""
+
+    @staticmethod
+    def weight(topic: Dict[str, Any], backlog: Optional[Set[Tuple[str, str]]] = None) -> float:
+        weight = LEVEL_WEIGHTS[TopicLevel(topic["level"])]
+        if backlog and (topic["subject"].strip().casefold(), topic["name"].strip().casefold()) in backlog:
+            weight *= BACKLOG_BOOST
+        return weight
+
+    @staticmethod
+    def distribute(weights: List[float], total_minutes: int) -> List[int]:
+        """
+        Split total_minutes in proportion to weights. Entries whose share
+        falls under the minimum are pinned to it and the rest is re-split;
+        whole minutes are handed out by largest remainder, so the result
+        always sums to total_minutes. If the total cannot cover the minimum
+        for every entry, each still gets at least one minute; callers must
+        not ask for fewer minutes than entries.
+        """
+        count = len(weights)
+        if not count:
+            return []
+
+        if total_minutes >= MIN_TOPIC_MINUTES * count:
+            minimum = MIN_TOPIC_MINUTES
+        else:
+            minimum = 1 if total_minutes >= count else 0
+        minutes = [0] * count
+
+        # Shares scale with weight, so the pinned entries are always the
+        # lightest ones: walk up from the lightest until shares clear the minimum
+        by_weight = sorted(range(count), key=lambda i: weights[i])
+        budget = total_minutes
+        weight_sum = sum(weights)
+        pinned = 0
+        while pinned < count and (weight_sum <= 0 or budget * weights[by_weight[pinned]] / weight_sum < minimum):
+            i = by_weight[pinned]
+            minutes[i] = minimum
+            budget -= minimum
+            weight_sum -= weights[i]
+            pinned += 1
+
+        free = by_weight[pinned:]
+        if not free:
+            return minutes
+
+        quotas = {i: budget * weights[i] / weight_sum for i in free}
+        for i in free:
+            minutes[i] = int(quotas[i])
+
+        leftover = budget - sum(minutes[i] for i in free)
+        by_remainder = sorted(free, key=lambda i: (quotas[i] - minutes[i], weights[i], -i), reverse=True)
+        for i in by_remainder[:leftover]:
+            minutes[i] += 1
+
+        return minutes
+
+    @staticmethod
+    def allocate(
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Weighted split of total_minutes over topics, in input order"""
+        weights = [AllocationEngine.weight(t, backlog) for t in topics]
+        minutes = AllocationEngine.distribute(weights, total_minutes)
+
+        return [
+            {
+                "name": t["name"],
+                "subject": t["subject"],
+                "level": t["level"],
+                "time_minutes": minutes[i]
+            }
+            for i, t in enumerate(topics)
+        ]
+
+    @staticmethod
+    def reconcile(
+        topics: List[Dict[str, Any]],
+        proposed: Dict[int, int],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Complete a partial or inexact proposal (topic index -> minutes, e.g.
+        from the LLM). Topics without a proposal are estimated from their
+        weight at the proposal's own minutes-per-weight rate, then the whole
+        set is re-split to total_minutes exactly. Returns topics in input
+        order, like allocate.
+        """
+        weights = [AllocationEngine.weight(t, backlog) for t in topics]
+        proposed_weight = sum(weights[i] for i in proposed)
+        rate = sum(proposed.values()) / proposed_weight if proposed_weight else 1.0
+
+        order = list(proposed) + [i for i in range(len(topics)) if i not in proposed]
+        targets = [max(1, proposed[i]) if i in proposed else weights[i] * rate for i in order]
+        # Split in proposal order so ties break the way the model ranked them
+        minutes = dict(zip(order, AllocationEngine.distribute(targets, total_minutes)))
+
+        return [
+            {
+                "name": t["name"],
+                "subject": t["subject"],
+                "level": t["level"],
+                "time_minutes": minutes[i]
+            }
+            for i, t in enumerate(topics)
+        ]
+
+
+allocation_engine = AllocationEngine()
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Callable, Dict, Optional, Set
+
+from models.schemas import Session, SessionState
+
+
+class AsyncSessionStoreMixin:
+    """
+    Awaitable forms of the session store calls made from async code. A
+    store that answers from process memory runs them inline; one that makes
+    network round trips sets blocking, and they run on a worker thread so
+    a slow backend cannot stall the event loop for every other request.
+    mutate closures then run on that thread too, so they must only touch
+    the session they are given.
+    """
+
+    blocking = False
+
+    async def _call(self, fn: Callable, *args):
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def acreate_session(self, session: Session) -> str:
+        return await self._call(self.create_session, session)
+
+    async def aget_session(self, session_id: str) -> Session:
+        return await self._call(self.get_session, session_id)
+
+    async def amutate(self, session_id: str, fn: Callable[[Session], None]) -> Session:
+        return await self._call(self.mutate, session_id, fn)
+
+    async def adelete_session(self, session_id: str) -> None:
+        return await self._call(self.delete_session, session_id)
+
+    async def aget_active_session(self, user_id: str) -> Optional[Session]:
+        return await self._call(self.get_active_session, user_id)
+
+    async def aget_latest_session(self, user_id: str, state: SessionState) -> Optional[Session]:
+        return await self._call(self.get_latest_session, user_id, state)
+
+    async def aget_session_ids_by_state(self, state: SessionState) -> Set[str]:
+        return await self._call(self.get_session_ids_by_state, state)
+
+    async def acount_by_state(self) -> Dict[str, int]:
+        return await self._call(self.count_by_state)
+
+    async def aget_stats(self) -> dict:
+        return await self._call(self.get_stats)
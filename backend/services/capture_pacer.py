@@ -0,0 +1,61 @@
+from typing import Dict
+
+from config.settings import settings
+from models.schemas import Session
+from services.emotion_timeline import EMOTIONS, NEGATIVE_CODES
+
+NEGATIVE_VALUES = frozenset(EMOTIONS[code].value for code in NEGATIVE_CODES)
+
+
+class CapturePacer:
+    """
+    Smooths each session's emotion probabilities and tells the client when
+    to send its next frame. A calm, steady session is sampled every
+    max_ms; negative probability mass, a trigger window filling with
+    negative emotions or fast-moving probabilities pull it towards min_ms.
+    """
+
+    def __init__(self, enabled: bool, alpha: float, default_ms: int, min_ms: int, max_ms: int):
+        self.enabled = enabled
+        self.alpha = min(1.0, max(0.01, alpha))
+        self.default_ms = default_ms
+        self.min_ms = min(min_ms, max_ms)
+        self.max_ms = max(min_ms, max_ms)
+
+    def observe(self, session: Session, probabilities: Dict[str, float]) -> None:
+        """Fold one frame's probabilities into the session's moving averages"""
+        previous = session.emotion_probabilities
+        if not previous:
+            session.emotion_probabilities = dict(probabilities)
+            return
+
+        # Half the L1 distance: 0 for the same distribution, 1 for disjoint ones
+        change = sum(abs(probabilities.get(k, 0.0) - previous.get(k, 0.0)) for k in previous.keys() | probabilities.keys()) / 2
+        session.emotion_drift += self.alpha * (change - session.emotion_drift)
+        session.emotion_probabilities = {
+            k: previous.get(k, 0.0) + self.alpha * (probabilities.get(k, 0.0) - previous.get(k, 0.0))
+            for k in previous.keys() | probabilities.keys()
+        }
+
+    def risk(self, session: Session) -> float:
+        """0 for steady and positive, 1 for about to trigger or changing fast"""
+        negative = sum(p for k, p in session.emotion_probabilities.items() if k in NEGATIVE_VALUES)
+        return min(1.0, max(negative, session.emotion_timeline.window_negative_share, session.emotion_drift))
+
+    def next_interval_ms(self, session: Session) -> int:
+        if not self.enabled or not session.emotion_probabilities:
+            return self.default_ms
+
+        # Squared so any sign of risk shortens the interval quickly
+        calm = (1.0 - self.risk(session)) ** 2
+        interval = self.min_ms + (self.max_ms - self.min_ms) * calm
+        return int(round(interval / 100) * 100)
+
+
+capture_pacer = CapturePacer(
+    enabled=settings.ADAPTIVE_CAPTURE_ENABLED,
+    alpha=settings.EMOTION_EMA_ALPHA,
+    default_ms=settings.CAPTURE_INTERVAL_MS,
+    min_ms=settings.CAPTURE_INTERVAL_MIN_MS,
+    max_ms=settings.CAPTURE_INTERVAL_MAX_MS
+)
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Tuple
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker. Opens when, over the last window_size
+    calls (and at least min_calls), the failure rate or the slow-call rate
+    crosses its threshold. While open, calls are refused for cooldown
+    seconds; then a single trial call is let through (half-open) and its
+    outcome closes the breaker again or re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate_threshold: float,
+        slow_call_seconds: float,
+        slow_call_rate_threshold: float,
+        cooldown_seconds: float
+    ):
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.cooldown = cooldown_seconds
+
+        self.state = CLOSED
+        # (failed, slow) per call, most recent last
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=max(1, window_size))
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.transition_counts: Dict[str, int] = {}
+        self.transitions: Deque[dict] = deque(maxlen=20)
+
+    def _transition(self, state: str, reason: str) -> None:
+        key = f"{self.state}->{state}"
+        self.transition_counts[key] = self.transition_counts.get(key, 0) + 1
+        self.transitions.append({
+            "from": self.state,
+            "to": state,
+            "reason": reason,
+            "at": datetime.utcnow().isoformat()
+        })
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._window.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; every True must be followed by record() or release()"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._transition(HALF_OPEN, "cool-down elapsed")
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """The allowed call was abandoned (e.g. cancelled) without an outcome"""
+        self._trial_in_flight = False
+
+    def record(self, success: bool, duration_s: float) -> None:
+        slow = duration_s >= self.slow_call_seconds
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            if success and not slow:
+                self._transition(CLOSED, "trial call succeeded")
+            else:
+                self._transition(OPEN, "trial call failed" if not success else "trial call too slow")
+            return
+
+        if self.state != CLOSED:
+            return
+
+        self._window.append((not success, slow))
+        if len(self._window) < self.min_calls:
+            return
+
+        if self.failure_rate >= self.failure_rate_threshold:
+            self._transition(OPEN, f"failure rate {self.failure_rate:.0%}")
+        elif self.slow_call_rate >= self.slow_call_rate_threshold:
+            self._transition(OPEN, f"slow call rate {self.slow_call_rate:.0%}")
+
+    @property
+    def failure_rate(self) -> float:
+        return sum(failed for failed, _ in self._window) / len(self._window) if self._window else 0.0
+
+    @property
+    def slow_call_rate(self) -> float:
+        return sum(slow for _, slow in self._window) / len(self._window) if self._window else 0.0
+
+    def get_stats(self) -> dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.cooldown - (time.monotonic() - self._opened_at)), 1)
+
+        return {
+            "name": self.name,
+            "state": self.state,
+            "retry_in_seconds": retry_in,
+            "window_calls": len(self._window),
+            "failure_rate": round(self.failure_rate, 3),
+            "slow_call_rate": round(self.slow_call_rate, 3),
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "transition_counts": self.transition_counts,
+            "recent_transitions": list(self.transitions)
+        }
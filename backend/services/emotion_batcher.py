@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from services.inference_engine import InferenceEngine, inference_engine
+
+
+class EmotionBatcher:
+    """Collects frames from concurrent requests into one batched inference call"""
+
+    def __init__(self, engine: InferenceEngine, max_batch_size: int, max_wait_ms: int,
+                 latency_window: int = 1024):
+        self.engine = engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._waiting: List[Tuple[Tuple[bytes, Optional[dict]], asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.frames = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    async def detect(self, frame_bytes: bytes, track: Optional[dict] = None) -> Dict[str, Any]:
+        """Queue a frame for the next batch and wait for its analysis result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting.append(((frame_bytes, track), future, time.perf_counter()))
+
+        if len(self._waiting) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._waiting = self._waiting, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Tuple[bytes, Optional[dict]], asyncio.Future, float]]) -> None:
+        self.batches += 1
+        self.frames += len(batch)
+        self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+
+        try:
+            results = await self.engine.analyze_frames([job for job, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        for (_, future, queued_at), result in zip(batch, results):
+            self._latencies.append(finished - queued_at)
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(p * len(latencies)))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch_size": round(self.frames / self.batches, 2) if self.batches else None,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 2) if latencies else None
+            }
+        }
+
+
+emotion_batcher = EmotionBatcher(
+    engine=inference_engine,
+    max_batch_size=settings.EMOTION_BATCH_MAX_SIZE,
+    max_wait_ms=settings.EMOTION_BATCH_MAX_WAIT_MS
+)
@@ -1,100 +1,251 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from models.schemas import Session, EmotionType
 from config.settings import settings
+from services.capture_pacer import capture_pacer
+from services.emotion_batcher import emotion_batcher
+from services.face_tracker import face_tracker
+from services.frame_dedup import frame_deduplicator
+from services.frame_decoder import choose_scale, decode_frame, jpeg_size, scale_box
+from services.model_registry import model_registry
 import cv2
 import numpy as np
-from deepface import DeepFace
+
+
+FACE_TEMPLATE_WIDTH = 32
+FACE_SEARCH_MARGIN = 0.25  # fraction of the face box searched around it
 
 
 class EmotionService:
     """Backend emotion detection using webcam frames"""
 
+    # -------- WORKER PROCESS SIDE --------
+    # These run inside inference worker processes, never on the event loop
+
     @staticmethod
-    def detect_emotion_from_frame(frame_bytes: bytes) -> EmotionType:
-        try:
-            np_arr = np.frombuffer(frame_bytes, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-            if img is None:
-                return EmotionType.NEUTRAL
-
-            result = DeepFace.analyze(
-                img,
-                actions=['emotion'],
-                enforce_detection=False
-            )
-
-            if isinstance(result, list):
-                result = result[0]
-
-            dominant = result.get("dominant_emotion", "neutral").lower()
-
-            if dominant == "sad":
-                return EmotionType.SAD
-            elif dominant == "angry":
-                return EmotionType.TIRED
-            elif dominant == "fear":
-                return EmotionType.TIRED
-            elif dominant == "happy":
-                return EmotionType.HAPPY
-            else:
-                return EmotionType.NEUTRAL
+    def _map_emotion(dominant: str) -> EmotionType:
+        dominant = dominant.lower()
+
+        if dominant == "sad":
+            return EmotionType.SAD
+        elif dominant == "angry":
+            return EmotionType.TIRED
+        elif dominant == "fear":
+            return EmotionType.TIRED
+        elif dominant == "happy":
+            return EmotionType.HAPPY
+        else:
+            return EmotionType.NEUTRAL
+
+    @staticmethod
+    def _detect_face(img: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]:
+        """Run the full detector, returning a BGR face crop and its box"""
+        from deepface import DeepFace
+
+        faces = DeepFace.extract_faces(
+            img,
+            detector_backend=settings.EMOTION_DETECTOR_BACKEND,
+            enforce_detection=False
+        )
+
+        if not faces:
+            return None, None
+
+        face = faces[0]["face"]
+        area = faces[0]["facial_area"]
+        if face.shape[0] == 0 or face.shape[1] == 0:
+            return None, None
+
+        box = (area["x"], area["y"], area["w"], area["h"])
+
+        # No face found: DeepFace falls back to the whole frame, nothing to track
+        if box == (0, 0, img.shape[1], img.shape[0]):
+            box = None
+
+        return face[:, :, ::-1], box
+
+    @staticmethod
+    def _face_template(img: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """Small grayscale patch of the face used to relocate it next frame"""
+        x, y, w, h = box
+        gray = img[y:y + h, x:x + w]
+        if gray.ndim == 3:
+            gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (FACE_TEMPLATE_WIDTH, max(1, round(h * FACE_TEMPLATE_WIDTH / w))))
+
+    @staticmethod
+    def _track_face(img: np.ndarray, track: Dict[str, Any]) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]], float]:
+        """Relocate the last face near its previous box by template matching (gray or BGR image)"""
+        x, y, w, h = track["box"]
+        template = track["template"]
+        scale = template.shape[1] / w
+
+        margin_x, margin_y = int(w * FACE_SEARCH_MARGIN), int(h * FACE_SEARCH_MARGIN)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(img.shape[1], x + w + margin_x), min(img.shape[0], y + h + margin_y)
+
+        window = img[y0:y1, x0:x1]
+        if window.ndim == 3:
+            window = cv2.cvtColor(window, cv2.COLOR_BGR2GRAY)
+        window = cv2.resize(window, (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale))))
+
+        if window.shape[0] < template.shape[0] or window.shape[1] < template.shape[1]:
+            return None, None, 0.0
 
+        scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        _, confidence, _, (tx, ty) = cv2.minMaxLoc(scores)
+
+        nx = min(img.shape[1] - w, x0 + int(tx / scale))
+        ny = min(img.shape[0] - h, y0 + int(ty / scale))
+        face = img[ny:ny + h, nx:nx + w]
+        if face.ndim == 2:
+            face = cv2.cvtColor(face, cv2.COLOR_GRAY2BGR)
+
+        return face.astype(np.float32) / 255, (nx, ny, w, h), float(confidence)
+
+    @staticmethod
+    def _locate_face(frame_bytes: bytes, track: Optional[Dict[str, Any]]) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]], bool, Optional[np.ndarray]]:
+        """
+        Returns (face, box, tracked, template), box in full-resolution pixels.
+        Tracked frames decode grayscale at the coarsest scale that keeps the
+        face at the emotion model's input size; detector frames decode colour
+        at the coarsest scale that keeps EMOTION_DETECT_MIN_SIDE pixels.
+        """
+        if track is not None:
+            scale = choose_scale(track["box"][2], model_registry.input_size)
+            img = decode_frame(frame_bytes, grayscale=True, scale=scale)
+
+            if img is not None:
+                face, box, confidence = EmotionService._track_face(
+                    img, {**track, "box": scale_box(track["box"], 1 / scale)}
+                )
+                if face is not None and confidence >= track["min_confidence"]:
+                    return face, scale_box(box, scale), True, EmotionService._face_template(img, box)
+
+        size = jpeg_size(frame_bytes)
+        scale = choose_scale(min(size), settings.EMOTION_DETECT_MIN_SIDE) if size else 1
+        img = decode_frame(frame_bytes, scale=scale)
+
+        if img is None:
+            return None, None, False, None
+
+        face, box = EmotionService._detect_face(img)
+        if box is None:
+            return face, None, False, None
+
+        return face, scale_box(box, scale), False, EmotionService._face_template(img, box)
+
+    @staticmethod
+    def analyze_frames(jobs: List[Tuple[bytes, Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Locate a face per frame - by tracking when a hint is given and still
+        matches, by the full detector otherwise - then classify all crops in
+        one forward pass of the emotion model.
+        """
+        from deepface import DeepFace
+        from deepface.models.demography import Emotion
+        from deepface.modules.preprocessing import resize_image
+
+        results = [
+            {"emotion": EmotionType.NEUTRAL.value, "probabilities": None, "box": None, "template": None, "tracked": False}
+            for _ in jobs
+        ]
+        faces, indices = [], []
+
+        for i, (frame_bytes, track) in enumerate(jobs):
+            try:
+                face, box, tracked, template = EmotionService._locate_face(frame_bytes, track)
+            except Exception:
+                continue
+
+            results[i].update({"box": box, "template": template, "tracked": tracked})
+
+            if face is not None:
+                # Same preprocessing DeepFace.analyze applies before the emotion model
+                faces.append(resize_image(img=face, target_size=(224, 224))[0])
+                indices.append(i)
+
+        if not faces:
+            return results
+
+        try:
+            model = DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+            predictions = np.asarray(model.predict(np.stack(faces))).reshape(len(faces), -1)
         except Exception:
-            return EmotionType.NEUTRAL
+            return results
+
+        for i, prediction in zip(indices, predictions):
+            label = Emotion.labels[int(np.argmax(prediction))]
+            results[i]["emotion"] = EmotionService._map_emotion(label).value
+
+            # The model's full distribution, folded onto our emotions the same way
+            probabilities = {emotion.value: 0.0 for emotion in EmotionType}
+            total = float(np.sum(prediction)) or 1.0
+            for model_label, p in zip(Emotion.labels, prediction):
+                probabilities[EmotionService._map_emotion(model_label).value] += float(p) / total
+            results[i]["probabilities"] = probabilities
+
+        return results
 
     @staticmethod
-    def add_emotion(session: Session, emotion: EmotionType) -> None:
-        session.emotions_buffer.append(emotion)
+    def detect_emotion_from_frame(frame_bytes: bytes) -> EmotionType:
+        return EmotionType(EmotionService.analyze_frames([(frame_bytes, None)])[0]["emotion"])
 
-        if len(session.emotions_buffer) > settings.EMOTION_BUFFER_SIZE:
-            session.emotions_buffer = session.emotions_buffer[-settings.EMOTION_BUFFER_SIZE:]
+    # -------- SESSION SIDE --------
+
+    @staticmethod
+    def add_emotion(
+        session: Session,
+        emotion: EmotionType,
+        probabilities: Optional[Dict[str, float]] = None
+    ) -> None:
+        session.emotion_timeline.append(emotion)
+        if probabilities:
+            capture_pacer.observe(session, probabilities)
 
     @staticmethod
     def check_trigger(session: Session) -> Tuple[bool, str]:
-        if len(session.emotions_buffer) < settings.EMOTION_BUFFER_SIZE:
+        timeline = session.emotion_timeline
+        if not timeline.window_full:
             return False, "Not enough emotion data yet"
 
-        recent_emotions = session.emotions_buffer[-settings.EMOTION_BUFFER_SIZE:]
-
-        all_negative = all(
-            emotion.value in settings.negative_emotions_list
-            for emotion in recent_emotions
-        )
-
-        if all_negative:
+        if timeline.window_all_negative:
             return True, "Detected consistent negative emotions. Reschedule recommended."
 
         return False, "Emotions are stable"
 
     @staticmethod
-    def process_frame(session: Session, frame_bytes: bytes) -> Tuple[bool, str, EmotionType]:
-        emotion = EmotionService.detect_emotion_from_frame(frame_bytes)
-        EmotionService.add_emotion(session, emotion)
-        trigger, msg = EmotionService.check_trigger(session)
-        return trigger, msg, emotion
+    async def classify_frame(
+        session_id: str, frame_bytes: bytes
+    ) -> Tuple[EmotionType, Optional[Dict[str, float]], bool]:
+        """
+        Returns (emotion, probabilities, cached); probabilities is None when
+        no face was found. The session is left for the caller to update.
+        """
+        signature = frame_deduplicator.signature(frame_bytes)
+        cached = frame_deduplicator.lookup(session_id, signature)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        result = await emotion_batcher.detect(frame_bytes, face_tracker.get_hint(session_id))
+        face_tracker.update(session_id, result)
+        emotion = EmotionType(result["emotion"])
+        probabilities = result.get("probabilities")
+        frame_deduplicator.store(session_id, signature, emotion, probabilities)
+        return emotion, probabilities, False
 
     @staticmethod
     def get_recent_emotions(session: Session, count: int = 3) -> List[EmotionType]:
-        return session.emotions_buffer[-count:] if session.emotions_buffer else []
+        return session.emotion_timeline.recent(count)
 
     @staticmethod
     def clear_buffer(session: Session) -> None:
-        session.emotions_buffer.clear()
+        session.emotion_timeline.clear_window()
 
     @staticmethod
     def get_emotion_summary(session: Session) -> dict:
-        if not session.emotions_buffer:
-            return {"total": 0, "distribution": {}}
-
-        distribution = {}
-        for emotion in session.emotions_buffer:
-            emotion_str = emotion.value
-            distribution[emotion_str] = distribution.get(emotion_str, 0) + 1
-
         return {
-            "total": len(session.emotions_buffer),
-            "distribution": distribution
+            "total": len(session.emotion_timeline),
+            "distribution": session.emotion_timeline.distribution()
         }
 
 
@@ -0,0 +1,162 @@
+import base64
+import time
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from models.schemas import EmotionType
+
+
+# Code of an emotion is its position here; append new emotions at the end
+EMOTIONS: List[EmotionType] = list(EmotionType)
+CODES: Dict[EmotionType, int] = {emotion: code for code, emotion in enumerate(EMOTIONS)}
+
+# Parsed once; the setting does not change while the app runs
+NEGATIVE_CODES = frozenset(
+    CODES[EmotionType(name)] for name in settings.negative_emotions_list if name in EmotionType._value2member_map_
+)
+
+
+class EmotionTimeline:
+    """
+    Every emotion detected in a session, one byte code plus a 4-byte
+    millisecond offset each, with the trigger window kept beside it as a
+    fixed ring of the last window_size codes. Per-emotion counts and the
+    window's negative count are updated on append, so trigger checks and
+    summaries never rescan the history.
+    """
+
+    def __init__(self, window_size: Optional[int] = None):
+        self.window_size = max(1, window_size or settings.EMOTION_BUFFER_SIZE)
+        self.started_ms: Optional[int] = None
+        self.codes = array("B")
+        self.offsets = array("I")  # ms since started_ms
+        self.counts = [0] * len(EMOTIONS)
+
+        self._ring = array("B", bytes(self.window_size))
+        self._head = 0  # next slot to write
+        self._filled = 0
+        self._negatives = 0
+        # History position the window was last cleared at
+        self._window_from = 0
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def append(self, emotion: EmotionType, at_ms: Optional[int] = None) -> None:
+        at_ms = int(time.time() * 1000) if at_ms is None else at_ms
+        if self.started_ms is None:
+            self.started_ms = at_ms
+
+        code = CODES[emotion]
+        self.codes.append(code)
+        self.offsets.append(max(0, at_ms - self.started_ms))
+        self.counts[code] += 1
+        self._push(code)
+
+    def _push(self, code: int) -> None:
+        if self._filled == self.window_size:
+            if self._ring[self._head] in NEGATIVE_CODES:
+                self._negatives -= 1
+        else:
+            self._filled += 1
+
+        self._ring[self._head] = code
+        if code in NEGATIVE_CODES:
+            self._negatives += 1
+        self._head = (self._head + 1) % self.window_size
+
+    def clear_window(self) -> None:
+        """Start a fresh trigger window; the history is kept"""
+        self._head = self._filled = self._negatives = 0
+        self._window_from = len(self.codes)
+
+    @property
+    def window_full(self) -> bool:
+        return self._filled == self.window_size
+
+    @property
+    def window_negative_share(self) -> float:
+        """How far the window is towards an all-negative trigger, 0 to 1"""
+        return self._negatives / self.window_size
+
+    @property
+    def window_all_negative(self) -> bool:
+        return self._filled == self.window_size and self._negatives == self.window_size
+
+    def window(self) -> List[EmotionType]:
+        """Emotions in the trigger window, oldest first"""
+        start = (self._head - self._filled) % self.window_size
+        return [EMOTIONS[self._ring[(start + i) % self.window_size]] for i in range(self._filled)]
+
+    def recent(self, count: int) -> List[EmotionType]:
+        """Up to count of the latest emotions since the window was last cleared"""
+        start = max(self._window_from, len(self.codes) - count)
+        return [EMOTIONS[code] for code in self.codes[start:]]
+
+    def history(self) -> List[EmotionType]:
+        return [EMOTIONS[code] for code in self.codes]
+
+    def timestamps(self) -> List[datetime]:
+        if self.started_ms is None:
+            return []
+        return [datetime.utcfromtimestamp((self.started_ms + offset) / 1000) for offset in self.offsets]
+
+    def distribution(self) -> Dict[str, int]:
+        return {EMOTIONS[code].value: count for code, count in enumerate(self.counts) if count}
+
+    def nbytes(self) -> int:
+        """Bytes held by the history and window buffers"""
+        return (
+            self.codes.buffer_info()[1] * self.codes.itemsize
+            + self.offsets.buffer_info()[1] * self.offsets.itemsize
+            + self.window_size
+        )
+
+    # -------- SERIALIZATION --------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_ms": self.started_ms,
+            "codes": base64.b64encode(self.codes.tobytes()).decode("ascii"),
+            "offsets": base64.b64encode(self.offsets.tobytes()).decode("ascii"),
+            "window_from": self._window_from
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EmotionTimeline":
+        timeline = cls()
+        timeline.started_ms = data.get("started_ms")
+        timeline.codes.frombytes(base64.b64decode(data.get("codes", "")))
+        timeline.offsets.frombytes(base64.b64decode(data.get("offsets", "")))
+
+        raw = timeline.codes.tobytes()
+        timeline.counts = [raw.count(bytes((code,))) for code in range(len(EMOTIONS))]
+
+        # The window is just the tail of the history since it was last cleared
+        timeline._window_from = min(data.get("window_from", 0), len(timeline.codes))
+        start = max(timeline._window_from, len(timeline.codes) - timeline.window_size)
+        for code in timeline.codes[start:]:
+            timeline._push(code)
+        return timeline
+
+    @classmethod
+    def from_emotions(cls, emotions: List[Any]) -> "EmotionTimeline":
+        """From a plain list of emotions, as sessions stored them before the timeline"""
+        timeline = cls()
+        for emotion in emotions:
+            timeline.append(EmotionType(emotion))
+        return timeline
+
+    @classmethod
+    def validate(cls, value: Any) -> "EmotionTimeline":
+        if isinstance(value, EmotionTimeline):
+            return value
+        if value is None:
+            return cls()
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        if isinstance(value, list):
+            return cls.from_emotions(value)
+        raise ValueError("Invalid emotion timeline")
@@ -0,0 +1,126 @@
+import asyncio
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+from config.settings import settings
+from services.redis_client import KEY_PREFIX
+
+
+class EventBus:
+    """In-process pub/sub that fans session events out to push subscribers"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, key: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, key: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(key)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[key]
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def publish(self, key: str, event: Dict[str, Any]) -> None:
+        self._deliver(key, event)
+
+    def _deliver(self, key: str, event: Dict[str, Any]) -> None:
+        """Deliver without blocking; a full queue means a stalled client, so drop"""
+        for queue in self._subscribers.get(key, ()):
+            try:
+                queue.put_nowait(event)
+                self.published += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "channels": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+
+class RedisEventBus(EventBus):
+    """
+    EventBus whose publish goes through Redis pub/sub, so an SSE client
+    connected to one worker hears about changes made on any other. A
+    listener thread hands incoming events back to this worker's loop, and
+    a single publisher thread sends outgoing ones in order, so a slow
+    Redis never blocks the caller.
+    """
+
+    def __init__(self, client, prefix: str = KEY_PREFIX, queue_size: int = 100):
+        super().__init__(queue_size)
+        self._redis = client
+        self.channel_prefix = f"{prefix}events:"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pubsub = None
+        self._thread = None
+        self._publisher: Optional[ThreadPoolExecutor] = None
+        self.publish_errors = 0
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-publisher")
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f"{self.channel_prefix}*": self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=0.05, daemon=True)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        if self._publisher is not None:
+            # Let queued events go out before the connection does
+            self._publisher.shutdown(wait=True)
+            self._publisher = None
+
+    def publish(self, key: str, event: Dict[str, Any]) -> None:
+        channel, data = f"{self.channel_prefix}{key}", json.dumps(event)
+        if self._publisher is None:
+            self._redis.publish(channel, data)
+            return
+        self._publisher.submit(self._redis.publish, channel, data).add_done_callback(self._on_published)
+
+    def _on_published(self, future: Future) -> None:
+        if future.exception() is not None:
+            self.publish_errors += 1
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        key = message["channel"].decode()[len(self.channel_prefix):]
+        event = json.loads(message["data"])
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._deliver, key, event)
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "publish_errors": self.publish_errors}
+
+
+def build_event_bus() -> EventBus:
+    """Local bus, or one relayed through Redis when workers share session state"""
+    if settings.SESSION_BACKEND.lower() == "redis":
+        from services.redis_client import get_redis
+        return RedisEventBus(get_redis())
+    return EventBus()
+
+
+event_bus = build_event_bus()
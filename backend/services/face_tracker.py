@@ -0,0 +1,98 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+
+
+class FaceTrack:
+    """Last known face region for one session"""
+
+    def __init__(self):
+        self.box: Optional[Tuple[int, int, int, int]] = None
+        self.template: Optional[np.ndarray] = None
+        self.frames_since_detect = 0
+        self.detector_runs = 0
+        self.detector_skips = 0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        total = self.detector_runs + self.detector_skips
+        return round(self.detector_skips / total, 3) if total else None
+
+
+class FaceTracker:
+    """Per-session face tracking so the full detector only runs when needed"""
+
+    def __init__(self, enabled: bool, redetect_interval: int, min_confidence: float):
+        self.enabled = enabled
+        self.redetect_interval = max(1, redetect_interval)
+        self.min_confidence = min_confidence
+        self._tracks: Dict[str, FaceTrack] = {}
+
+    def get_hint(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Tracking hint for the worker, or None to force full detection"""
+        if not self.enabled:
+            return None
+
+        track = self._tracks.get(session_id)
+        if track is None or track.box is None or track.template is None:
+            return None
+        if track.frames_since_detect + 1 >= self.redetect_interval:
+            return None
+
+        return {
+            "box": track.box,
+            "template": track.template,
+            "min_confidence": self.min_confidence
+        }
+
+    def update(self, session_id: str, result: Dict[str, Any]) -> None:
+        """Record the worker's outcome for a frame"""
+        if not self.enabled:
+            return
+
+        track = self._tracks.setdefault(session_id, FaceTrack())
+
+        if result.get("tracked"):
+            track.detector_skips += 1
+            track.frames_since_detect += 1
+        else:
+            track.detector_runs += 1
+            track.frames_since_detect = 0
+
+        track.box = result.get("box")
+        track.template = result.get("template")
+
+    def forget(self, session_id: str) -> None:
+        self._tracks.pop(session_id, None)
+
+    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
+        track = self._tracks.get(session_id, FaceTrack())
+        return {
+            "enabled": self.enabled,
+            "tracking": track.box is not None,
+            "detector_runs": track.detector_runs,
+            "detector_skips": track.detector_skips,
+            "hit_rate": track.hit_rate
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        runs = sum(t.detector_runs for t in self._tracks.values())
+        skips = sum(t.detector_skips for t in self._tracks.values())
+        return {
+            "enabled": self.enabled,
+            "redetect_interval": self.redetect_interval,
+            "min_confidence": self.min_confidence,
+            "sessions": len(self._tracks),
+            "detector_runs": runs,
+            "detector_skips": skips,
+            "hit_rate": round(skips / (runs + skips), 3) if runs + skips else None
+        }
+
+
+face_tracker = FaceTracker(
+    enabled=settings.FACE_TRACK_ENABLED,
+    redetect_interval=settings.FACE_TRACK_REDETECT_INTERVAL,
+    min_confidence=settings.FACE_TRACK_MIN_CONFIDENCE
+)
@@ -0,0 +1,68 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# IMREAD flags for each DCT scaling factor libjpeg supports natively
+_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+}
+
+# JPEG start-of-frame markers that carry the image dimensions
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(frame_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from the JPEG header without decoding, None if not a JPEG"""
+    if frame_bytes[:2] != b"\xff\xd8":
+        return None
+
+    i = 2
+    length = len(frame_bytes)
+    while i + 9 < length:
+        if frame_bytes[i] != 0xFF:
+            return None
+
+        marker = frame_bytes[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+
+        segment_length = int.from_bytes(frame_bytes[i + 2:i + 4], "big")
+        if marker in _SOF_MARKERS:
+            height = int.from_bytes(frame_bytes[i + 5:i + 7], "big")
+            width = int.from_bytes(frame_bytes[i + 7:i + 9], "big")
+            return width, height
+
+        i += 2 + segment_length
+
+    return None
+
+
+def choose_scale(length_px: int, min_px: int) -> int:
+    """Largest supported reduction that keeps length_px at or above min_px"""
+    for factor in (8, 4, 2):
+        if length_px // factor >= min_px:
+            return factor
+    return 1
+
+
+def decode_frame(frame_bytes: bytes, grayscale: bool = False, scale: int = 1) -> Optional[np.ndarray]:
+    """Decode at 1/scale resolution; for JPEGs libjpeg skips the discarded DCT work"""
+    flags = _GRAYSCALE_FLAGS if grayscale else _COLOR_FLAGS
+    np_arr = np.frombuffer(frame_bytes, np.uint8)
+    return cv2.imdecode(np_arr, flags[scale])
+
+
+def scale_box(box: Tuple[int, int, int, int], factor: float) -> Tuple[int, int, int, int]:
+    return tuple(int(round(v * factor)) for v in box)
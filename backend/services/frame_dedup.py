@@ -0,0 +1,78 @@
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import settings
+from models.schemas import EmotionType
+from services.frame_decoder import decode_frame
+
+
+SIGNATURE_SIZE = 16
+
+
+class FrameDeduplicator:
+    """Skips inference for frames that barely differ from the last analyzed one"""
+
+    def __init__(self, enabled: bool, threshold: float):
+        self.enabled = enabled
+        self.threshold = threshold
+        # session -> (signature, emotion, probabilities) of the last analyzed frame
+        self._last: Dict[str, Tuple[np.ndarray, EmotionType, Optional[Dict[str, float]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(frame_bytes: bytes) -> Optional[np.ndarray]:
+        """Tiny grayscale thumbnail, decoded at 1/8 scale straight from the JPEG"""
+        img = decode_frame(frame_bytes, grayscale=True, scale=8)
+
+        if img is None:
+            return None
+
+        thumb = cv2.resize(img, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+        return thumb.astype(np.float32) / 255
+
+    def lookup(
+        self, session_id: str, signature: Optional[np.ndarray]
+    ) -> Optional[Tuple[EmotionType, Optional[Dict[str, float]]]]:
+        """Return the cached (emotion, probabilities) if this frame matches the last analyzed one"""
+        if not self.enabled or signature is None:
+            return None
+
+        last = self._last.get(session_id)
+        if last is not None and float(np.mean(np.abs(signature - last[0]))) <= self.threshold:
+            self.hits += 1
+            return last[1], last[2]
+
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        session_id: str,
+        signature: Optional[np.ndarray],
+        emotion: EmotionType,
+        probabilities: Optional[Dict[str, float]] = None
+    ) -> None:
+        if self.enabled and signature is not None:
+            self._last[session_id] = (signature, emotion, probabilities)
+
+    def forget(self, session_id: str) -> None:
+        self._last.pop(session_id, None)
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None
+        }
+
+
+frame_deduplicator = FrameDeduplicator(
+    enabled=settings.FRAME_DEDUP_ENABLED,
+    threshold=settings.FRAME_DEDUP_THRESHOLD
+)
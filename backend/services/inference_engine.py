@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+from config.settings import settings
+from utils.exceptions import InferenceQueueFullException
+
+
+# -------- WORKER PROCESS SIDE --------
+
+def _worker_init() -> None:
+    """Load and warm the models once when a worker process starts"""
+    from services.model_registry import model_registry
+    model_registry.load_and_warm()
+
+
+def _worker_status() -> dict:
+    from services.model_registry import model_registry
+    return model_registry.worker_status()
+
+
+def _worker_analyze_frames(jobs: List[Tuple[bytes, Optional[dict]]]) -> List[dict]:
+    from services.emotion_service import EmotionService
+    return EmotionService.analyze_frames(jobs)
+
+
+# -------- EVENT LOOP SIDE --------
+
+class InferenceEngine:
+    """Process pool running emotion inference off the event loop"""
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self.queue_size = max(self.workers, queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Spawn the worker pool (idempotent)"""
+        if self._executor is not None:
+            return
+
+        # spawn keeps TensorFlow state out of forked children
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling queued work"""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker, rejecting when the queue is full"""
+        if self._pending >= self.queue_size:
+            self.rejected += 1
+            raise InferenceQueueFullException()
+
+        self.start()
+        self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, fn, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM) - rebuild the pool for the next frame
+            self.failed += 1
+            self.shutdown()
+            raise
+        finally:
+            self._pending -= 1
+
+    async def analyze_frames(self, jobs: List[Tuple[bytes, Optional[dict]]]) -> List[dict]:
+        return await self.run(_worker_analyze_frames, jobs)
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed
+        }
+
+
+inference_engine = InferenceEngine(
+    workers=settings.INFERENCE_WORKERS,
+    queue_size=settings.INFERENCE_QUEUE_SIZE
+)
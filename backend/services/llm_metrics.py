@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+def _percentile(samples: Deque[float], p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(p * len(ordered)))
+    return round(ordered[index] * 1000, 2)
+
+
+class LLMMetrics:
+    """Timings of Ollama generations, kept over a sliding window of calls"""
+
+    def __init__(self, window: int = 256):
+        self.calls = 0
+        self.streamed = 0
+        self.aborted_early = 0
+        self.fallbacks: Dict[str, int] = {}
+        self._first_item: Deque[float] = deque(maxlen=window)
+        self._total: Deque[float] = deque(maxlen=window)
+        # Ollama's own per-call breakdown: model load, prompt eval, generation
+        self.generations = 0
+        self._load: Deque[float] = deque(maxlen=window)
+        self._prompt_eval: Deque[float] = deque(maxlen=window)
+        self._eval: Deque[float] = deque(maxlen=window)
+        self.last_generation: Optional[dict] = None
+
+    def record(self, total_s: float, first_item_s: Optional[float] = None,
+               streamed: bool = False, aborted_early: bool = False) -> None:
+        self.calls += 1
+        self._total.append(total_s)
+        if streamed:
+            self.streamed += 1
+        if first_item_s is not None:
+            self._first_item.append(first_item_s)
+        if aborted_early:
+            self.aborted_early += 1
+
+    def record_generation(self, final_chunk: dict) -> None:
+        """Timings from the final chunk of a finished generation (durations in ns)"""
+        load_s = final_chunk.get("load_duration", 0) / 1e9
+        prompt_eval_s = final_chunk.get("prompt_eval_duration", 0) / 1e9
+        eval_s = final_chunk.get("eval_duration", 0) / 1e9
+
+        self.generations += 1
+        self._load.append(load_s)
+        self._prompt_eval.append(prompt_eval_s)
+        self._eval.append(eval_s)
+        self.last_generation = {
+            "load_ms": round(load_s * 1000, 2),
+            "prompt_eval_ms": round(prompt_eval_s * 1000, 2),
+            "prompt_tokens": final_chunk.get("prompt_eval_count", 0),
+            "eval_ms": round(eval_s * 1000, 2),
+            "eval_tokens": final_chunk.get("eval_count", 0)
+        }
+
+    def record_fallback(self, reason: str) -> None:
+        self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+
+    def get_stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "streamed": self.streamed,
+            "aborted_early": self.aborted_early,
+            "fallbacks": self.fallbacks,
+            "time_to_first_topic_ms": {
+                "p50": _percentile(self._first_item, 0.50),
+                "p95": _percentile(self._first_item, 0.95)
+            },
+            "total_ms": {
+                "p50": _percentile(self._total, 0.50),
+                "p95": _percentile(self._total, 0.95)
+            },
+            "generations": self.generations,
+            "load_ms": {
+                "p50": _percentile(self._load, 0.50),
+                "p95": _percentile(self._load, 0.95)
+            },
+            "prompt_eval_ms": {
+                "p50": _percentile(self._prompt_eval, 0.50),
+                "p95": _percentile(self._prompt_eval, 0.95)
+            },
+            "eval_ms": {
+                "p50": _percentile(self._eval, 0.50),
+                "p95": _percentile(self._eval, 0.95)
+            },
+            "last_generation": self.last_generation
+        }
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config.settings import settings
+
+
+class ModelRegistry:
+    """Loads and warms the emotion models before real frames arrive"""
+
+    def __init__(self):
+        # Worker process side
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.input_size = 48  # emotion model input side, read from the model on load
+
+        # Event loop side
+        self.ready = False
+        self.error: Optional[str] = None
+        self.workers: List[Dict[str, Any]] = []
+
+    # -------- WORKER PROCESS SIDE --------
+
+    def load(self) -> None:
+        """Build the emotion classifier and face detector"""
+        from deepface import DeepFace
+
+        started = time.perf_counter()
+        emotion_model = DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+        DeepFace.build_model(model_name=settings.EMOTION_DETECTOR_BACKEND, task="face_detector")
+        self.input_size = int(emotion_model.model.input_shape[1])
+        self.load_seconds = time.perf_counter() - started
+
+    def warm(self) -> None:
+        """Push a synthetic frame through the full detection path"""
+        from services.emotion_service import EmotionService
+
+        frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+        cv2.circle(frame, (320, 240), 120, (200, 180, 160), -1)
+        ok, encoded = cv2.imencode(".jpg", frame)
+        if not ok:
+            raise RuntimeError("Failed to encode warm-up frame")
+
+        started = time.perf_counter()
+        EmotionService.detect_emotion_from_frame(encoded.tobytes())
+        self.warmup_seconds = time.perf_counter() - started
+
+    def load_and_warm(self) -> None:
+        self.load()
+        self.warm()
+
+    def worker_status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds
+        }
+
+    # -------- EVENT LOOP SIDE --------
+
+    async def warm_up(self, engine) -> None:
+        """Spawn every inference worker and wait until each one is warm"""
+        if not settings.EMOTION_DETECTION_ENABLED:
+            self.ready = True
+            return
+
+        from services.inference_engine import _worker_status
+
+        try:
+            # Workers load and warm in their initializer, so a reply means warm
+            replies = await asyncio.gather(
+                *(engine.run(_worker_status) for _ in range(engine.workers))
+            )
+            self.workers = list({r["pid"]: r for r in replies}.values())
+            self.ready = True
+        except Exception as e:
+            self.error = str(e)
+
+    def get_status(self) -> Dict[str, Any]:
+        loads = [w["load_seconds"] for w in self.workers if w["load_seconds"] is not None]
+        warms = [w["warmup_seconds"] for w in self.workers if w["warmup_seconds"] is not None]
+
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "workers_warmed": len(self.workers),
+            "max_load_seconds": round(max(loads), 3) if loads else None,
+            "max_warmup_seconds": round(max(warms), 3) if warms else None,
+            "workers": self.workers
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from config.settings import settings
+from models.schemas import LIVE_STATES
+from services.ollama_service import ollama_service
+from services.session_store import session_store
+
+
+def _model_names(payload: dict) -> List[str]:
+    return [m.get("name") or m.get("model", "") for m in payload.get("models", [])]
+
+
+class OllamaMonitor:
+    """
+    Polls Ollama in the background so requests never probe it themselves.
+    Routes read the cached status; while Ollama is down the polling backs
+    off exponentially up to max_backoff. While sessions are live it also
+    keeps the model loaded, so allocations do not pay for a cold start.
+    """
+
+    def __init__(self, interval_seconds: float, max_backoff_seconds: float, keep_warm_seconds: float = 0):
+        self.interval = max(0.5, interval_seconds)
+        self.max_backoff = max(self.interval, max_backoff_seconds)
+        self.keep_warm_interval = keep_warm_seconds
+
+        self.available = False
+        self.models: List[str] = []
+        self.loaded_models: List[str] = []
+        self.last_seen: Optional[datetime] = None
+        self.last_checked: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.probes = 0
+        self.keep_warm_error: Optional[str] = None
+
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def model_available(self) -> bool:
+        return any(name.split(":latest")[0] == ollama_service.model for name in self.models)
+
+    @property
+    def model_loaded(self) -> bool:
+        return any(name.split(":latest")[0] == ollama_service.model for name in self.loaded_models)
+
+    @property
+    def next_delay(self) -> float:
+        if not self.consecutive_failures:
+            return self.interval
+        return min(self.max_backoff, self.interval * 2 ** self.consecutive_failures)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def probe(self) -> bool:
+        """One round trip to /api/tags (installed models) and /api/ps (loaded ones)"""
+        self.probes += 1
+        self.last_checked = datetime.utcnow()
+        try:
+            tags = await ollama_service.client.get("/api/tags", timeout=5)
+            tags.raise_for_status()
+            self.models = _model_names(tags.json())
+
+        except Exception as e:
+            self.available = False
+            self.error = str(e) or type(e).__name__
+            self.consecutive_failures += 1
+            return False
+
+        # /api/ps is newer than /api/tags, and slow to answer while a
+        # generation hogs the CPU; neither makes Ollama unavailable
+        try:
+            running = await ollama_service.client.get("/api/ps", timeout=5)
+            self.loaded_models = _model_names(running.json()) if running.status_code == 200 else []
+        except Exception:
+            self.loaded_models = []
+
+        self.available = True
+        self.error = None
+        self.last_seen = self.last_checked
+        self.consecutive_failures = 0
+        return True
+
+    async def _sessions_live(self) -> bool:
+        counts = await session_store.acount_by_state()
+        return any(counts.get(state.value) for state in LIVE_STATES)
+
+    async def keep_warm(self) -> bool:
+        """Ping the model if it is unloaded or idle for keep_warm_interval while sessions are live"""
+        if not self.keep_warm_interval or settings.ALLOCATION_MODE != "llm":
+            return False
+        if not (self.available and self.model_available) or not await self._sessions_live():
+            return False
+
+        idle = ollama_service.idle_seconds
+        if self.model_loaded and idle is not None and idle < self.keep_warm_interval:
+            return False
+
+        try:
+            await ollama_service.keep_warm()
+        except Exception as e:
+            self.keep_warm_error = str(e) or type(e).__name__
+            return False
+
+        self.keep_warm_error = None
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await self.keep_warm()
+            await asyncio.sleep(self.next_delay)
+
+    def get_status(self) -> dict:
+        return {
+            "available": self.available,
+            "model": ollama_service.model,
+            "model_available": self.model_available,
+            "model_loaded": self.model_loaded,
+            "models": self.models,
+            "loaded_models": self.loaded_models,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "consecutive_failures": self.consecutive_failures,
+            "next_check_seconds": self.next_delay,
+            "error": self.error,
+            "keep_warm_interval_seconds": self.keep_warm_interval,
+            "keep_warm_error": self.keep_warm_error
+        }
+
+
+ollama_monitor = OllamaMonitor(
+    interval_seconds=settings.OLLAMA_HEALTH_INTERVAL_SECONDS,
+    max_backoff_seconds=settings.OLLAMA_HEALTH_MAX_BACKOFF_SECONDS,
+    keep_warm_seconds=settings.OLLAMA_KEEP_WARM_INTERVAL_SECONDS
+)
@@ -1,138 +1,411 @@
-import requests
+import asyncio
+import httpx
 import json
-from typing import List, Dict, Any
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
 from config.settings import settings
+from services.allocation_cache import allocation_cache, canonical_proposal, proposal_for
+from services.allocation_engine import allocation_engine
+from services.circuit_breaker import CircuitBreaker
+from services.llm_metrics import LLMMetrics
+from services.topic_matcher import TopicMatcher
 from utils.exceptions import OllamaException 
+from utils.json_stream import JsonArrayStream
 from models.schemas import Topic 
 
 
+# Bump whenever the initial prompt changes meaning, so cached
+# allocations from the old prompt stop matching
+INITIAL_PROMPT_VERSION = 2
+
+# Sent as the "system" field and identical on every call, so it is always
+# the leading part of the prompt and Ollama can reuse its evaluated prefix;
+# only the topic list after it changes between sessions
+INITIAL_SYSTEM_PROMPT = """You are a study schedule allocator.
+
+Weight Rules:
+- UNKNOWN topics: +20% priority
+- KNOWN topics: -10% priority
+- PARTIAL topics: no change
+
+Rules:
+1. Allocate ALL of the total available time exactly
+2. Each topic minimum 5 minutes
+3. Return ONLY valid JSON
+
+Format:
+{
+ "schedule":[
+   {"name":"Topic","time_minutes":20}
+ ]
+}
+"""
+
+
+def _keep_alive(value: str) -> Any:
+    """
+    Ollama reads a JSON number as seconds but parses any string as a Go
+    duration, which needs a unit; so "-1" or "3600" must go out as numbers
+    """
+    value = value.strip()
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
 class OllamaService:
 
     def __init__(self):
         self.base_url = settings.OLLAMA_BASE_URL
         self.model = settings.OLLAMA_MODEL
         self.timeout = settings.OLLAMA_TIMEOUT
+        self.streaming = settings.OLLAMA_STREAMING
+        self.keep_alive = _keep_alive(settings.OLLAMA_KEEP_ALIVE)
+        self.last_used: Optional[float] = None
+        self.keep_warm_pings = 0
+        # cache key -> shared result of the generation in flight for it
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.deduplicated = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self.metrics = LLMMetrics()
+        self.latency_budget = settings.OLLAMA_ALLOCATION_BUDGET_SECONDS
+        self.breaker = CircuitBreaker(
+            name="ollama",
+            window_size=settings.LLM_BREAKER_WINDOW,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            failure_rate_threshold=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=settings.LLM_BREAKER_SLOW_CALL_RATE,
+            cooldown_seconds=settings.LLM_BREAKER_COOLDOWN_SECONDS
+        )
 
-    def check_connection(self) -> bool:
-        try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except Exception:
-            return False
+    # -------- HTTP CLIENT --------
+
+    def start(self) -> None:
+        """Open the shared keep-alive connection pool"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=settings.OLLAMA_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Scripts that skip the app lifespan still get a pool
+        if self._client is None:
+            self.start()
+        return self._client
+
+    @property
+    def idle_seconds(self) -> Optional[float]:
+        """Time since the model was last used or pinged, None if never"""
+        return None if self.last_used is None else time.monotonic() - self.last_used
+
+    async def keep_warm(self) -> None:
+        """Load the model if it is not, and restart its keep_alive countdown"""
+        # A generate request without a prompt only loads the model
+        response = await self.client.post(
+            "/api/generate",
+            json={"model": self.model, "keep_alive": self.keep_alive}
+        )
+        response.raise_for_status()
+        self.last_used = time.monotonic()
+        self.keep_warm_pings += 1
 
     # 🔥 NEW INITIAL ALLOCATION FUNCTION
-    def allocate_initial_schedule(self, topics: List[Dict[str, Any]], total_minutes: int) -> List[Dict[str, Any]]:
-        prompt = self._build_initial_prompt(topics, total_minutes)
+    async def allocate_initial_schedule(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        result = await self.llm_initial_schedule(topics, total_minutes, backlog)
+        if result is None:
+            return self._fallback_initial(topics, total_minutes, backlog)
+        return result
+
+    async def llm_initial_schedule(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """The LLM's allocation (cached or fresh), or None when it is out of reach"""
+        cache_key = allocation_cache.make_key(topics, total_minutes, self.model, INITIAL_PROMPT_VERSION)
+        proposed = await self._initial_proposal(topics, total_minutes, cache_key)
+        if proposed is None:
+            return None
+
+        # Only the model's minutes are shared between callers. The model's
+        # minutes rarely add up and it can leave topics out: keep its
+        # proportions, estimate the missing ones from this caller's own
+        # backlog, fix the total
+        return allocation_engine.reconcile(topics, proposed, total_minutes, backlog)
 
+    async def _initial_proposal(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        cache_key: str
+    ) -> Optional[Dict[int, int]]:
+        """The model's topic index -> minutes for these topics, cached or fresh"""
+        cached = allocation_cache.get(cache_key, topics)
+        if cached:
+            return cached
+
+        # Identical requests (a class submitting the same syllabus) share one
+        # generation; shield so a cancelled waiter leaves it running for the rest
+        shared = self._in_flight.get(cache_key)
+        if shared is not None:
+            self.deduplicated += 1
+            items = await asyncio.shield(shared)
+            return proposal_for(items, topics) if items is not None else None
+
+        shared = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = shared
+        proposed = None
+        try:
+            proposed = await self._request_initial_proposal(topics, total_minutes, cache_key)
+            return proposed
+        finally:
+            # Never an exception: if the generation was cancelled, waiters fall back.
+            # Keyed by topic, so waiters with another spelling or order can map it
+            del self._in_flight[cache_key]
+            shared.set_result(canonical_proposal(proposed, topics) if proposed is not None else None)
+
+    async def _request_initial_proposal(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        cache_key: str
+    ) -> Optional[Dict[int, int]]:
+        # Fail fast while Ollama has been failing or crawling
+        if not self.breaker.allow():
+            self.metrics.record_fallback("breaker_open")
+            return None
+
+        started = time.perf_counter()
         try:
-            response = self._call_ollama(prompt)
-            return self._parse_initial_response(response, topics)
+            proposed = await asyncio.wait_for(
+                self._propose_with_llm(topics, total_minutes),
+                timeout=self.latency_budget
+            )
+        except asyncio.TimeoutError:
+            self.breaker.record(False, time.perf_counter() - started)
+            self.metrics.record_fallback("budget_exceeded")
+            return None
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception:
-            return self._fallback_initial(topics, total_minutes)
+            # Fallbacks are not cached: the next request should try the LLM again
+            self.breaker.record(False, time.perf_counter() - started)
+            self.metrics.record_fallback("error")
+            return None
+
+        self.breaker.record(True, time.perf_counter() - started)
+        allocation_cache.put(cache_key, proposed, topics)
+        return proposed
+
+    async def _propose_with_llm(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int
+    ) -> Dict[int, int]:
+        """The model's minutes per topic index, as generated"""
+        if self.streaming:
+            proposed = {
+                item["index"]: item["time_minutes"]
+                async for item in self.stream_initial_schedule(topics, total_minutes)
+            }
+        else:
+            started = time.perf_counter()
+            response = await self._call_ollama(self._build_initial_prompt(topics, total_minutes), INITIAL_SYSTEM_PROMPT)
+            self.metrics.record(time.perf_counter() - started)
+            proposed = self._parse_initial_response(response, topics)
+
+        if not proposed:
+            raise ValueError("No valid topics")
+        return proposed
+
+    async def stream_initial_schedule(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield each topic's allocation as soon as the model has closed its
+        JSON object, and stop the generation once every topic is covered.
+        Minutes are the model's own; "index" is the topic's input position.
+        """
+        parser = JsonArrayStream("schedule")
+        matcher = TopicMatcher(topics)
+        started = time.perf_counter()
+        first_topic: Optional[float] = None
+
+        chunks = self._stream_ollama(self._build_initial_prompt(topics, total_minutes), INITIAL_SYSTEM_PROMPT)
+        try:
+            async for chunk in chunks:
+                for item in parser.feed(chunk):
+                    allocation = self._match_item(item, matcher)
+                    if allocation is None:
+                        continue
+
+                    if first_topic is None:
+                        first_topic = time.perf_counter() - started
+                    yield allocation
+
+                if matcher.complete or parser.done:
+                    break
+        finally:
+            # Closing the response drops the connection, which makes Ollama
+            # stop generating whatever it had left to say
+            await chunks.aclose()
+            self.metrics.record(
+                time.perf_counter() - started,
+                first_item_s=first_topic,
+                streamed=True,
+                aborted_early=matcher.complete and not parser.done
+            )
 
     def _build_initial_prompt(self, topics: List[Dict[str, Any]], total_minutes: int) -> str:
+        """The per-session part of the prompt; the rules live in INITIAL_SYSTEM_PROMPT"""
 
         subject_block = ""
         for t in topics:
             subject_block += f"- {t['subject']} → {t['name']} ({t['level']})\n"
 
-        return f"""
-You are a study schedule allocator.
-
-Topics:
+        return f"""Topics:
 {subject_block}
-
 Total available time: {total_minutes} minutes
-
-Weight Rules:
-- UNKNOWN topics: +20% priority
-- KNOWN topics: -10% priority
-- PARTIAL topics: no change
-
-Rules:
-1. Allocate ALL {total_minutes} minutes exactly
-2. Each topic minimum 5 minutes
-3. Return ONLY valid JSON
-
-Format:
-{{
- "schedule":[
-   {{"name":"Topic","time_minutes":20}}
- ]
-}}
 """
 
-    def _parse_initial_response(self, response: str, original_topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _parse_initial_response(self, response: str, original_topics: List[Dict[str, Any]]) -> Dict[int, int]:
+        """Proposed minutes per topic index, in the order the model listed them"""
         data = json.loads(response)
 
         if "schedule" not in data:
             raise ValueError("Invalid response")
 
-        result = []
+        matcher = TopicMatcher(original_topics)
+        proposed: Dict[int, int] = {}
 
         for item in data["schedule"]:
-            match = next(
-                (
-                    t for t in original_topics
-                    if item["name"].lower() in t["name"].lower()
-                    or t["name"].lower() in item["name"].lower()
-                ),
-                None
-            )
+            allocation = self._match_item(item, matcher)
+            if allocation:
+                proposed[allocation["index"]] = allocation["time_minutes"]
 
-            if match:
-                result.append({
-                    "name": match["name"],
-                    "subject": match["subject"],
-                    "level": match["level"],
-                    "time_minutes": max(5, int(item["time_minutes"]))
-                })
-
-        if not result:
-            raise ValueError("No valid topics")
+        return proposed
 
-        return result
+    def _match_item(self, item: Dict[str, Any], matcher: TopicMatcher) -> Optional[Dict[str, Any]]:
+        """Map one LLM schedule entry back onto the topic it names, claiming it"""
+        try:
+            name = str(item["name"])
+            minutes = int(item["time_minutes"])
+        except (KeyError, TypeError, ValueError):
+            return None
 
-    def _fallback_initial(self, topics: List[Dict[str, Any]], total_minutes: int):
+        index = matcher.assign(name)
+        if index is None:
+            return None
 
-        per_topic = max(5, int(total_minutes / len(topics)))
+        match = matcher.topics[index]
+        return {
+            "index": index,
+            "name": match["name"],
+            "subject": match["subject"],
+            "level": match["level"],
+            "time_minutes": max(5, minutes)
+        }
 
-        return [
-            {
-                "name": t["name"],
-                "subject": t["subject"],
-                "level": t["level"],
-                "time_minutes": per_topic
-            }
-            for t in topics
-        ]
+    def _fallback_initial(
+        self,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        return allocation_engine.allocate(topics, total_minutes, backlog)
 
     # -------- EXISTING RESCHEDULE --------
 
-    def reschedule_topics(self, remaining_topics: List[Topic], total_remaining_minutes: int) -> List[Dict[str, Any]]:
+    async def reschedule_topics(self, remaining_topics: List[Topic], total_remaining_minutes: int) -> List[Dict[str, Any]]:
         return [{"name": t.name, "time_minutes": t.time_minutes} for t in remaining_topics]
 
-    def _call_ollama(self, prompt: str) -> str:
-        url = f"{self.base_url}/api/generate"
-
+    def _generate_payload(self, prompt: str, system: Optional[str], stream: bool) -> Dict[str, Any]:
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
-            "format": "json"
+            "stream": stream,
+            "format": "json",
+            "keep_alive": self.keep_alive
         }
+        if system:
+            payload["system"] = system
+        return payload
+
+    async def _call_ollama(self, prompt: str, system: Optional[str] = None) -> str:
+        payload = self._generate_payload(prompt, system, stream=False)
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = await self.client.post("/api/generate", json=payload)
             response.raise_for_status()
             data = response.json()
+            self.last_used = time.monotonic()
+            self.metrics.record_generation(data)
             return data.get("response", "")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
+            raise OllamaException("Request timed out")
+        except httpx.ConnectError:
+            raise OllamaException("Cannot connect to Ollama.")
+        except httpx.HTTPError as e:
+            raise OllamaException(f"Request failed: {str(e)}")
+
+    async def _stream_ollama(self, prompt: str, system: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield response text fragments as Ollama generates them"""
+        payload = self._generate_payload(prompt, system, stream=True)
+
+        try:
+            async with self.client.stream("POST", "/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise OllamaException(data["error"])
+                    self.last_used = time.monotonic()
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        self.metrics.record_generation(data)
+                        return
+        except httpx.TimeoutException:
             raise OllamaException("Request timed out")
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             raise OllamaException("Cannot connect to Ollama.")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise OllamaException(f"Request failed: {str(e)}")
 
+    def get_stats(self) -> dict:
+        return {
+            "model": self.model,
+            "streaming": self.streaming,
+            "latency_budget_seconds": self.latency_budget,
+            "keep_alive": self.keep_alive,
+            "keep_warm_pings": self.keep_warm_pings,
+            "in_flight": len(self._in_flight),
+            "deduplicated": self.deduplicated,
+            "idle_seconds": round(self.idle_seconds, 1) if self.idle_seconds is not None else None,
+            **self.metrics.get_stats(),
+            "breaker": self.breaker.get_stats()
+        }
+
 
 ollama_service = OllamaService()
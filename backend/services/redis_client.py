@@ -0,0 +1,18 @@
+from config.settings import settings
+
+
+KEY_PREFIX = "mindtrack:"
+
+_client = None
+
+
+def get_redis():
+    """Process-wide Redis client, created on first use (redis is optional)"""
+    global _client
+    if _client is None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package") from e
+        _client = redis.Redis.from_url(settings.SESSION_REDIS_URL)
+    return _client
@@ -0,0 +1,218 @@
+import uuid
+from typing import Callable, Dict, Optional, Set
+
+from config.settings import settings
+from models.schemas import LIVE_STATES, Session, SessionState
+from services.async_store import AsyncSessionStoreMixin
+from services.redis_client import KEY_PREFIX
+from utils.exceptions import SessionConflictException, SessionNotFoundException
+
+
+class RedisSessionStore(AsyncSessionStoreMixin):
+    """
+    SessionStore API on top of Redis so every uvicorn worker sees the same
+    sessions. Each session is one JSON value; user and state indexes are
+    Redis sets kept in step inside the same MULTI transaction as the write.
+    Reads return fresh copies, so callers must write back what they change.
+    Every call is a blocking round trip, so async code uses the a* forms,
+    which run on a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = KEY_PREFIX):
+        self._redis = client
+        self.prefix = prefix
+        self.conflicts = 0
+        self.retries = 0
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}user:{user_id}:sessions"
+
+    def _live_key(self, user_id: str) -> str:
+        return f"{self.prefix}user:{user_id}:live"
+
+    def _state_key(self, state: SessionState) -> str:
+        return f"{self.prefix}state:{state.value}"
+
+    def _load(self, data: Optional[bytes]) -> Optional[Session]:
+        return Session.model_validate_json(data) if data is not None else None
+
+    def _commit(
+        self,
+        session_id: str,
+        build: Callable[[Session], Session]
+    ) -> Session:
+        """
+        Optimistic read-modify-write: WATCH the session (and its user's live
+        pointer), build the new state, write it with its index updates in
+        one MULTI/EXEC, and start over if another worker got there first
+        """
+        from redis.exceptions import WatchError
+
+        key = self._session_key(session_id)
+        for attempt in range(max(1, settings.SESSION_MUTATE_RETRIES)):
+            if attempt:
+                self.retries += 1
+            with self._redis.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    current = self._load(pipe.get(key))
+                    if current is None:
+                        raise SessionNotFoundException(session_id)
+
+                    previous_state = current.state
+                    live_key = self._live_key(current.user_id)
+                    pipe.watch(live_key)
+                    live_id = pipe.get(live_key)
+
+                    session = build(current)
+                    if session.backlog is None:
+                        session.backlog = []
+                    session.version = current.version + 1
+
+                    pipe.multi()
+                    pipe.set(key, session.model_dump_json())
+                    if previous_state != session.state:
+                        pipe.srem(self._state_key(previous_state), session_id)
+                        pipe.sadd(self._state_key(session.state), session_id)
+                    if session.state in LIVE_STATES:
+                        pipe.set(live_key, session_id)
+                    elif live_id is not None and live_id.decode() == session_id:
+                        pipe.delete(live_key)
+                    pipe.execute()
+                    return session
+                except WatchError:
+                    continue
+        raise SessionConflictException(session_id)
+
+    def create_session(self, session: Session) -> str:
+        """Create a new session and return its ID"""
+        session_id = str(uuid.uuid4())
+        session.session_id = session_id
+
+        if session.backlog is None:
+            session.backlog = []
+
+        for topic in session.topics:
+            if not hasattr(topic, "subject") or topic.subject is None:
+                topic.subject = "General"
+            if not hasattr(topic, "level") or topic.level is None:
+                topic.level = "partial"
+
+        pipe = self._redis.pipeline()
+        pipe.set(self._session_key(session_id), session.model_dump_json())
+        pipe.sadd(self._user_key(session.user_id), session_id)
+        pipe.sadd(self._state_key(session.state), session_id)
+        if session.state in LIVE_STATES:
+            pipe.set(self._live_key(session.user_id), session_id)
+        pipe.execute()
+        return session_id
+
+    def get_session(self, session_id: str) -> Session:
+        """Get session by ID, raise exception if not found"""
+        session = self._load(self._redis.get(self._session_key(session_id)))
+        if not session:
+            raise SessionNotFoundException(session_id)
+        return session
+
+    def update_session(self, session_id: str, session: Session) -> None:
+        """Write back a copy, failing with a conflict if it is no longer current"""
+        def build(current: Session) -> Session:
+            if session.version != current.version:
+                self.conflicts += 1
+                raise SessionConflictException(session_id)
+            # Shallow copy: the version bump must not leak into the caller's
+            # object unless EXEC actually succeeds
+            return session.model_copy()
+
+        session.version = self._commit(session_id, build).version
+
+    def mutate(self, session_id: str, fn: Callable[[Session], None]) -> Session:
+        """
+        Read-modify-write that re-reads and re-applies fn when another
+        worker wrote in between. fn must be synchronous and repeatable.
+        """
+        def build(current: Session) -> Session:
+            fn(current)
+            return current
+
+        return self._commit(session_id, build)
+
+    def delete_session(self, session_id: str) -> None:
+        """Delete a session"""
+        session = self.get_session(session_id)
+        live_key = self._live_key(session.user_id)
+
+        pipe = self._redis.pipeline()
+        pipe.delete(self._session_key(session_id))
+        pipe.srem(self._user_key(session.user_id), session_id)
+        pipe.srem(self._state_key(session.state), session_id)
+        if self._redis.get(live_key) == session_id.encode():
+            pipe.delete(live_key)
+        pipe.execute()
+
+    def get_all_sessions(self) -> Dict[str, Session]:
+        """Get all sessions"""
+        keys = list(self._redis.scan_iter(match=f"{self.prefix}session:*"))
+        sessions = [self._load(data) for data in self._redis.mget(keys)] if keys else []
+        return {s.session_id: s for s in sessions if s is not None}
+
+    def session_exists(self, session_id: str) -> bool:
+        """Check if session exists"""
+        return bool(self._redis.exists(self._session_key(session_id)))
+
+    def get_active_session(self, user_id: str) -> Optional[Session]:
+        """Get the user's active, paused or rescheduling session"""
+        session_id = self._redis.get(self._live_key(user_id))
+        if session_id is None:
+            return None
+        return self._load(self._redis.get(self._session_key(session_id.decode())))
+
+    def get_latest_session(self, user_id: str, state: SessionState) -> Optional[Session]:
+        """Most recently created session of the user in the given state"""
+        ids = self._redis.sinter(self._user_key(user_id), self._state_key(state))
+        if not ids:
+            return None
+        keys = [self._session_key(i.decode()) for i in ids]
+        sessions = [s for s in map(self._load, self._redis.mget(keys)) if s is not None]
+        return max(sessions, key=lambda s: s.created_at) if sessions else None
+
+    def get_session_ids_by_state(self, state: SessionState) -> Set[str]:
+        """IDs of all sessions currently in the given state"""
+        return {i.decode() for i in self._redis.smembers(self._state_key(state))}
+
+    def count_by_state(self) -> Dict[str, int]:
+        pipe = self._redis.pipeline()
+        for state in SessionState:
+            pipe.scard(self._state_key(state))
+        return {state.value: count for state, count in zip(SessionState, pipe.execute())}
+
+    def restore(self) -> int:
+        """
+        Nothing to load: the data already lives in Redis, and a session that
+        is rescheduling may well be in the hands of another live worker
+        """
+        return 0
+
+    def close(self) -> None:
+        self._redis.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "by_state": self.count_by_state(),
+            "storage": {
+                "backend": "redis"
+            },
+            "conflicts": self.conflicts,
+            "retries": self.retries
+        }
+
+    def clear_all(self) -> None:
+        """Clear all sessions (for testing)"""
+        keys = list(self._redis.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._redis.delete(*keys)
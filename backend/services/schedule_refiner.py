@@ -0,0 +1,157 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.schemas import LIVE_STATES, Session, SessionState, TopicStatus
+from services.allocation_engine import allocation_engine
+from services.ollama_service import ollama_service
+from services.session_events import publish_session_event
+from services.session_store import session_store
+from utils.exceptions import SessionNotFoundException
+
+
+class _NothingToRefine(Exception):
+    """Aborts the patch without writing the session"""
+
+
+PENDING = "pending"
+RUNNING = "running"
+APPLIED = "applied"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+class RefinementJob:
+    def __init__(self, session_id: str):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.status = PENDING
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.patched_topics = 0
+        self.detail: Optional[str] = None
+
+    def finish(self, status: str, detail: Optional[str] = None) -> None:
+        self.status = status
+        self.detail = detail
+        self.finished_at = datetime.utcnow()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "patched_topics": self.patched_topics,
+            "detail": self.detail,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ScheduleRefiner:
+    """
+    Sessions start on the local engine's schedule; this asks the LLM for
+    its allocation in the background and, when it lands, re-splits the
+    minutes of the topics that are still pending. Active and finished
+    topics keep theirs, so the session total stays what the user asked for.
+    Jobs live in this worker's memory; the newest max_jobs are kept.
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, RefinementJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.counts: Dict[str, int] = {}
+
+    def submit(
+        self,
+        session_id: str,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]] = None
+    ) -> RefinementJob:
+        job = RefinementJob(session_id)
+        self._jobs[session_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, topics, total_minutes, backlog))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get_job(self, session_id: str) -> Optional[RefinementJob]:
+        return self._jobs.get(session_id)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(
+        self,
+        job: RefinementJob,
+        topics: List[Dict[str, Any]],
+        total_minutes: int,
+        backlog: Optional[Set[Tuple[str, str]]]
+    ) -> None:
+        job.status = RUNNING
+        try:
+            allocated = await ollama_service.llm_initial_schedule(topics, total_minutes, backlog)
+            if allocated is None:
+                job.finish(SKIPPED, "LLM unavailable, keeping the local schedule")
+            else:
+                await self._apply(job, topics, allocated)
+        except asyncio.CancelledError:
+            job.finish(FAILED, "cancelled")
+            raise
+        except SessionNotFoundException:
+            job.finish(SKIPPED, "session no longer exists")
+        except Exception as e:
+            job.finish(FAILED, str(e))
+        finally:
+            self.counts[job.status] = self.counts.get(job.status, 0) + 1
+
+    async def _apply(self, job: RefinementJob, topics: List[Dict[str, Any]], allocated: List[Dict[str, Any]]) -> None:
+        # Allocations come back in input order, the same as the session topics
+        minutes = [item["time_minutes"] for item in allocated]
+
+        def patch(current: Session) -> None:
+            if current.state not in LIVE_STATES or current.state == SessionState.RESCHEDULING:
+                raise _NothingToRefine(f"session is {current.state.value}")
+            if current.reschedule_count:
+                # A reschedule already worked from fresher information
+                raise _NothingToRefine("session was rescheduled")
+
+            pending = [i for i, t in enumerate(current.topics) if t.status == TopicStatus.PENDING]
+            if not pending:
+                raise _NothingToRefine("no pending topics")
+
+            # Pending topics share what they already had between them, so the
+            # session total does not move
+            budget = sum(current.topics[i].time_minutes for i in pending)
+            refined = allocation_engine.distribute([minutes[i] for i in pending], budget)
+            for i, value in zip(pending, refined):
+                current.topics[i].time_minutes = value
+            job.patched_topics = len(pending)
+
+        try:
+            session = await session_store.amutate(job.session_id, patch)
+        except _NothingToRefine as e:
+            job.finish(SKIPPED, str(e))
+            return
+
+        job.finish(APPLIED)
+        publish_session_event(session, "schedule_refined", job=job.to_dict())
+
+    def get_stats(self) -> dict:
+        return {
+            "running": len(self._tasks),
+            "tracked_jobs": len(self._jobs),
+            "outcomes": self.counts
+        }
+
+
+schedule_refiner = ScheduleRefiner()
@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from models.schemas import Session
+
+
+class SessionBackend:
+    """Persistence behind SessionStore; the base class keeps nothing (memory only)"""
+
+    name = "memory"
+
+    def load_all(self) -> List[Session]:
+        return []
+
+    def save(self, session: Session) -> None:
+        pass
+
+    def delete(self, session_id: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def get_stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    SQLite (WAL mode) persistence with write-behind batching. save() only
+    records the latest serialized state per session; a background thread
+    writes everything dirty in one transaction every flush interval, so the
+    several update_session calls a single request makes cost one row write.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, flush_interval_ms: int, max_batch: int):
+        self.path = path
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.max_batch = max(1, max_batch)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+            """
+        )
+
+        # session_id -> (user_id, state, json), or None for a pending delete
+        self._dirty: Dict[str, Optional[Tuple[str, str, str]]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+        self.saves = 0
+        self.rows_written = 0
+        self.flushes = 0
+
+        self._thread = threading.Thread(target=self._run, name="session-flusher", daemon=True)
+        self._thread.start()
+
+    def load_all(self) -> List[Session]:
+        rows = self._conn.execute("SELECT data FROM sessions").fetchall()
+        return [Session.model_validate_json(data) for (data,) in rows]
+
+    def save(self, session: Session) -> None:
+        # Serialize now, on the caller's thread, so the flusher never reads a
+        # Session object that a request handler is in the middle of mutating
+        row = (session.user_id, session.state.value, session.model_dump_json())
+        with self._lock:
+            self._dirty[session.session_id] = row
+            self.saves += 1
+            pending = len(self._dirty)
+        if pending >= self.max_batch:
+            self._wake.set()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._dirty[session_id] = None
+        self._wake.set()
+
+    def flush(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        upserts = [(sid, *row) for sid, row in dirty.items() if row is not None]
+        deletes = [(sid,) for sid, row in dirty.items() if row is None]
+
+        with self._write_lock:
+            self._conn.execute("BEGIN")
+            try:
+                if upserts:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO sessions (session_id, user_id, state, data) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(session_id) DO UPDATE SET
+                            user_id = excluded.user_id,
+                            state = excluded.state,
+                            data = excluded.data
+                        """,
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # Put the batch back unless newer writes superseded it
+                with self._lock:
+                    for sid, row in dirty.items():
+                        self._dirty.setdefault(sid, row)
+                raise
+
+        self.flushes += 1
+        self.rows_written += len(dirty)
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                if settings.DEBUG:
+                    print(f"Session flush failed, will retry: {e}")
+
+    def close(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self._conn.close()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._dirty)
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "saves": self.saves,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "pending": pending
+        }
+
+
+def build_session_backend() -> SessionBackend:
+    backend = settings.SESSION_BACKEND.lower()
+
+    if backend == "sqlite":
+        return SQLiteSessionBackend(
+            path=settings.SESSION_DB_PATH,
+            flush_interval_ms=settings.SESSION_FLUSH_INTERVAL_MS,
+            max_batch=settings.SESSION_FLUSH_MAX_BATCH
+        )
+    if backend == "memory":
+        return SessionBackend()
+
+    raise ValueError(f"Unknown SESSION_BACKEND '{settings.SESSION_BACKEND}'")
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from models.schemas import Session, Topic, TopicResponse
+from services.event_bus import event_bus
+from services.timer_service import TimerService
+
+
+# Events after which the session has nothing more to push
+TERMINAL_EVENTS = {"session_completed", "session_deleted"}
+
+
+def topic_response(topic: Topic) -> TopicResponse:
+    return TopicResponse(
+        name=topic.name,
+        subject=topic.subject,
+        level=topic.level,
+        time_minutes=topic.time_minutes,
+        status=topic.status,
+        actual_time_spent=int(topic.actual_time_spent_seconds / 60),
+        started_at=topic.started_at,
+        completed_at=topic.completed_at
+    )
+
+
+def session_snapshot(session: Session) -> Dict[str, Any]:
+    """Everything a client needs to render the dashboard and run the countdown locally"""
+    current_topic = TimerService.get_current_topic(session)
+
+    return {
+        "session_id": session.session_id,
+        "state": session.state.value,
+        "topic": topic_response(current_topic).model_dump(mode="json") if current_topic else None,
+        "index": session.current_topic_index,
+        "total_topics": len(session.topics),
+        "timer_remaining_seconds": TimerService.get_remaining_seconds(session),
+        "timer_running": session.timer_started_at is not None,
+        "server_time": datetime.utcnow().isoformat()
+    }
+
+
+def publish_session_event(session: Session, event_type: str, **extra: Any) -> None:
+    event_bus.publish(session.session_id, {
+        "type": event_type,
+        "session": session_snapshot(session),
+        **extra
+    })
@@ -1,14 +1,69 @@
-from typing import Dict, Optional
-from models.schemas import Session, SessionState
-from utils.exceptions import SessionNotFoundException
+from typing import Callable, Dict, Optional, Set
+from config.settings import settings
+from models.schemas import LIVE_STATES, Session, SessionState
+from services.async_store import AsyncSessionStoreMixin
+from services.session_backends import SessionBackend, build_session_backend
+from services.timer_service import TimerService
+from utils.exceptions import SessionConflictException, SessionNotFoundException
 import uuid
 
 
-class SessionStore:
-    """In-memory session storage"""
+class SessionStore(AsyncSessionStoreMixin):
+    """
+    Session storage, indexed by user and by state. Reads are always served
+    from memory; the backend persists writes behind the scenes.
 
-    def __init__(self):
+    Lookups return the stored object itself, without copying, so callers
+    must treat it as read-only. All changes go through mutate, which works
+    on one private copy and swaps it in with a version check, so a handler
+    that awaited in between cannot silently overwrite someone else's
+    update. A stored session is never changed in place. Being in memory,
+    the async forms of these calls run inline on the event loop.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend] = None):
         self._sessions: Dict[str, Session] = {}
+        self.backend = backend or SessionBackend()
+        self.conflicts = 0
+        self.retries = 0
+
+        # Secondary indexes, kept in step on every write
+        self._live_by_user: Dict[str, str] = {}
+        self._ids_by_user: Dict[str, Set[str]] = {}
+        self._ids_by_state: Dict[SessionState, Set[str]] = {state: set() for state in SessionState}
+        self._indexed_state: Dict[str, SessionState] = {}
+
+    def _index(self, session: Session) -> None:
+        session_id = session.session_id
+        previous = self._indexed_state.get(session_id)
+
+        if previous != session.state:
+            if previous is not None:
+                self._ids_by_state[previous].discard(session_id)
+            self._ids_by_state[session.state].add(session_id)
+            self._indexed_state[session_id] = session.state
+
+        self._ids_by_user.setdefault(session.user_id, set()).add(session_id)
+
+        if session.state in LIVE_STATES:
+            self._live_by_user[session.user_id] = session_id
+        elif self._live_by_user.get(session.user_id) == session_id:
+            del self._live_by_user[session.user_id]
+
+    def _unindex(self, session: Session) -> None:
+        session_id = session.session_id
+        state = self._indexed_state.pop(session_id, None)
+        if state is not None:
+            self._ids_by_state[state].discard(session_id)
+
+        user_ids = self._ids_by_user.get(session.user_id)
+        if user_ids is not None:
+            user_ids.discard(session_id)
+            if not user_ids:
+                del self._ids_by_user[session.user_id]
+
+        if self._live_by_user.get(session.user_id) == session_id:
+            del self._live_by_user[session.user_id]
 
     def create_session(self, session: Session) -> str:
         """Create a new session and return its ID"""
@@ -26,52 +81,144 @@ class SessionStore:
             if not hasattr(topic, "level") or topic.level is None:
                 topic.level = "partial"
 
-        self._sessions[session_id] = session
+        stored = session.model_copy(deep=True)
+        self._sessions[session_id] = stored
+        self._index(stored)
+        self.backend.save(stored)
         return session_id
 
     def get_session(self, session_id: str) -> Session:
-        """Get session by ID, raise exception if not found"""
+        """Get the session by ID (read-only), raise exception if not found"""
         session = self._sessions.get(session_id)
         if not session:
             raise SessionNotFoundException(session_id)
         return session
 
     def update_session(self, session_id: str, session: Session) -> None:
-        """Update existing session"""
-        if session_id not in self._sessions:
+        """
+        Store a private copy the caller made of a read and hands over; the
+        caller must not touch it afterwards. Fails with a conflict if the
+        session was written since that copy was read.
+        """
+        stored = self._sessions.get(session_id)
+        if stored is None:
             raise SessionNotFoundException(session_id)
+        if session.version != stored.version:
+            self.conflicts += 1
+            raise SessionConflictException(session_id)
 
         # Ensure backlog structure remains valid
         if session.backlog is None:
             session.backlog = []
 
+        session.version += 1
         self._sessions[session_id] = session
+        self._index(session)
+        self.backend.save(session)
+
+    def mutate(self, session_id: str, fn: Callable[[Session], None]) -> Session:
+        """
+        Read-modify-write that re-reads and re-applies fn on conflict. fn
+        must be synchronous and safe to run more than once; whatever it
+        raises aborts the update. Returns the session as written (read-only).
+        """
+        for attempt in range(max(1, settings.SESSION_MUTATE_RETRIES)):
+            if attempt:
+                self.retries += 1
+            # The only copy on the write path; the stored one stays untouched
+            session = self.get_session(session_id).model_copy(deep=True)
+            fn(session)
+            try:
+                self.update_session(session_id, session)
+                return session
+            except SessionConflictException:
+                continue
+        raise SessionConflictException(session_id)
 
     def delete_session(self, session_id: str) -> None:
         """Delete a session"""
         if session_id not in self._sessions:
             raise SessionNotFoundException(session_id)
-        del self._sessions[session_id]
+        self._unindex(self._sessions.pop(session_id))
+        self.backend.delete(session_id)
 
     def get_all_sessions(self) -> Dict[str, Session]:
-        """Get all sessions"""
-        return self._sessions
+        """Get all sessions (read-only)"""
+        return dict(self._sessions)
 
     def session_exists(self, session_id: str) -> bool:
         """Check if session exists"""
         return session_id in self._sessions
 
-    def get_active_session(self) -> Optional[Session]:
-        """Get the first active session (for MVP - single session)"""
-        for session in self._sessions.values():
-            if session.state in [SessionState.ACTIVE, SessionState.PAUSED]:
-                return session
-        return None
+    def get_active_session(self, user_id: str) -> Optional[Session]:
+        """Get the user's active, paused or rescheduling session (read-only) in O(1)"""
+        session_id = self._live_by_user.get(user_id)
+        return self._sessions[session_id] if session_id else None
+
+    def get_latest_session(self, user_id: str, state: SessionState) -> Optional[Session]:
+        """Most recently created session of the user in the given state (read-only)"""
+        candidates = self._ids_by_user.get(user_id, set()) & self._ids_by_state[state]
+        sessions = [self._sessions[session_id] for session_id in candidates]
+        return max(sessions, key=lambda s: s.created_at) if sessions else None
+
+    def get_session_ids_by_state(self, state: SessionState) -> Set[str]:
+        """IDs of all sessions currently in the given state"""
+        return set(self._ids_by_state[state])
+
+    def count_by_state(self) -> Dict[str, int]:
+        return {state.value: len(ids) for state, ids in self._ids_by_state.items()}
+
+    def restore(self) -> int:
+        """
+        Load persisted sessions at startup. A reschedule that was in flight
+        died with the old process, so those sessions go back to active.
+        """
+        restored = 0
+        for session in self.backend.load_all():
+            before = (session.state, session.timer_started_at)
+            if session.state == SessionState.RESCHEDULING:
+                session.state = SessionState.ACTIVE
+                TimerService.resume_timer(session)
+            if session.state == SessionState.ACTIVE:
+                TimerService.restore_timer(session)
+
+            self._sessions[session.session_id] = session
+            self._index(session)
+            if (session.state, session.timer_started_at) != before:
+                self.backend.save(session)
+            restored += 1
+        return restored
+
+    def close(self) -> None:
+        """Flush pending writes and release the backend"""
+        self.backend.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "by_state": self.count_by_state(),
+            "conflicts": self.conflicts,
+            "retries": self.retries,
+            "storage": self.backend.get_stats()
+        }
 
     def clear_all(self) -> None:
         """Clear all sessions (for testing)"""
         self._sessions.clear()
+        self._live_by_user.clear()
+        self._ids_by_user.clear()
+        self._indexed_state.clear()
+        for ids in self._ids_by_state.values():
+            ids.clear()
+
+
+def build_session_store():
+    """SessionStore for this process, or the Redis-backed store shared by all workers"""
+    if settings.SESSION_BACKEND.lower() == "redis":
+        from services.redis_client import get_redis
+        from services.redis_session_store import RedisSessionStore
+        return RedisSessionStore(get_redis())
+    return SessionStore(build_session_backend())
 
 
 # Global session store instance
-session_store = SessionStore()
+session_store = build_session_store()
@@ -0,0 +1,33 @@
+from typing import Dict
+
+
+class StreamMetrics:
+    """Connection and message counters for long-lived push/stream channels"""
+
+    def __init__(self):
+        self._channels: Dict[str, Dict[str, int]] = {}
+
+    def _channel(self, name: str) -> Dict[str, int]:
+        return self._channels.setdefault(
+            name, {"active": 0, "total": 0, "messages_in": 0, "messages_out": 0}
+        )
+
+    def connected(self, name: str) -> None:
+        channel = self._channel(name)
+        channel["active"] += 1
+        channel["total"] += 1
+
+    def disconnected(self, name: str) -> None:
+        self._channel(name)["active"] -= 1
+
+    def received(self, name: str) -> None:
+        self._channel(name)["messages_in"] += 1
+
+    def sent(self, name: str) -> None:
+        self._channel(name)["messages_out"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(counts) for name, counts in self._channels.items()}
+
+
+stream_metrics = StreamMetrics()
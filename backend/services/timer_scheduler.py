@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+
+class TimerScheduler:
+    """
+    Deadlines for every running topic timer, kept in one min-heap and
+    served by a single loop.call_later handle armed for the earliest one.
+    Each key has at most one deadline: scheduling again replaces it and
+    cancelling only marks the heap entry dead (O(log n) and O(1)). Dead
+    entries are skipped when they reach the top and purged in bulk once
+    they outnumber the live ones.
+    """
+
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self):
+        # entry: [deadline (time.monotonic), seq, key, alive]
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._dead = 0
+
+        self._handler: Optional[Callable[[str], None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._armed: Optional[asyncio.TimerHandle] = None
+        self._armed_at: Optional[float] = None
+
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+        self.handler_errors = 0
+        self._lag: Deque[float] = deque(maxlen=1024)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------- LIFECYCLE --------
+
+    def start(self, handler: Callable[[str], None]) -> None:
+        """Begin firing; deadlines scheduled before this are kept"""
+        self._handler = handler
+        self._loop = asyncio.get_running_loop()
+        self._arm()
+
+    def stop(self) -> None:
+        if self._armed is not None:
+            self._armed.cancel()
+        self._armed = self._armed_at = None
+        self._loop = None
+
+    # -------- DEADLINES --------
+
+    def schedule(self, key: str, delay_seconds: float) -> None:
+        """(Re)set key's deadline delay_seconds from now"""
+        self._discard(key)
+        entry = [time.monotonic() + max(0.0, delay_seconds), next(self._seq), key, True]
+        heapq.heappush(self._heap, entry)
+        self._entries[key] = entry
+        self.scheduled += 1
+
+        if self._armed_at is None or entry[0] < self._armed_at:
+            self._arm()
+
+    def cancel(self, key: str) -> bool:
+        if not self._discard(key):
+            return False
+        self.cancelled += 1
+        return True
+
+    def deadline_in(self, key: str) -> Optional[float]:
+        """Seconds until key fires, None if nothing is scheduled for it"""
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0] - time.monotonic()
+
+    def _discard(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        entry[3] = False
+        self._dead += 1
+        if self._dead >= self.COMPACT_MIN_DEAD and self._dead > len(self._entries):
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return True
+
+    # -------- FIRING --------
+
+    def _arm(self) -> None:
+        """Point the loop timer at the earliest live deadline"""
+        if self._loop is None:
+            return
+
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+            self._dead -= 1
+
+        if self._armed is not None:
+            self._armed.cancel()
+            self._armed = self._armed_at = None
+
+        if self._heap:
+            self._armed_at = self._heap[0][0]
+            self._armed = self._loop.call_later(max(0.0, self._armed_at - time.monotonic()), self._fire)
+
+    def _fire(self) -> None:
+        self._armed = self._armed_at = None
+        now = time.monotonic()
+
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key, alive = heapq.heappop(self._heap)
+            if not alive:
+                self._dead -= 1
+                continue
+
+            del self._entries[key]
+            self.fired += 1
+            self._lag.append(now - deadline)
+            try:
+                self._handler(key)
+            except Exception:
+                self.handler_errors += 1
+
+        self._arm()
+
+    def get_stats(self) -> dict:
+        lag = sorted(self._lag)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lag:
+                return None
+            return round(lag[min(len(lag) - 1, int(p * len(lag)))] * 1000, 2)
+
+        return {
+            "pending": len(self._entries),
+            "heap_size": len(self._heap),
+            "scheduled": self.scheduled,
+            "cancelled": self.cancelled,
+            "fired": self.fired,
+            "handler_errors": self.handler_errors,
+            "fire_lag_ms": {"p50": percentile(0.50), "p99": percentile(0.99)}
+        }
+
+
+timer_scheduler = TimerScheduler()
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from models.schemas import Session, Topic, TopicStatus
+from models.schemas import Session, SessionState, Topic, TopicStatus
 from utils.exceptions import NoActiveTopicException
 
 
@@ -19,6 +19,46 @@ class TimerService:
 
         session.timer_started_at = datetime.utcnow()
 
+    @staticmethod
+    def advance_topic(session: Session, completed: bool) -> None:
+        """Close the current topic, as done or into the backlog, and start the next"""
+        current_topic = TimerService.get_current_topic(session)
+        if not current_topic:
+            raise NoActiveTopicException()
+
+        TimerService.stop_timer(session)
+
+        if completed:
+            current_topic.status = TopicStatus.COMPLETED
+            current_topic.completed_at = datetime.utcnow()
+        else:
+            current_topic.status = TopicStatus.BACKLOG
+            session.backlog.append({
+                "name": current_topic.name,
+                "subject": current_topic.subject
+            })
+
+        session.current_topic_index += 1
+
+        if session.current_topic_index >= len(session.topics):
+            session.state = SessionState.COMPLETED
+            session.completed_at = datetime.utcnow()
+        else:
+            TimerService.start_topic_timer(session, session.current_topic_index)
+
+    @staticmethod
+    def get_remaining_time(session: Session) -> Optional[float]:
+        """Unrounded seconds left on the current topic, negative once overrun"""
+        current_topic = TimerService.get_current_topic(session)
+        if not current_topic:
+            return None
+
+        spent_seconds = current_topic.actual_time_spent_seconds
+        if session.timer_started_at:
+            spent_seconds += (datetime.utcnow() - session.timer_started_at).total_seconds()
+
+        return current_topic.time_minutes * 60 - spent_seconds
+
     @staticmethod
     def get_remaining_seconds(session: Session) -> Optional[int]:
         current_topic = TimerService.get_current_topic(session)
@@ -57,6 +97,33 @@ class TimerService:
     def resume_timer(session: Session) -> None:
         session.timer_started_at = datetime.utcnow()
 
+    @staticmethod
+    def restore_timer(session: Session) -> None:
+        """
+        Re-derive a running timer after a restart. Wall-clock time kept
+        counting while the server was down, but a topic cannot bank more
+        than its allotted time from the outage.
+        """
+        if not session.timer_started_at:
+            return
+
+        current_topic = TimerService.get_current_topic(session)
+        if not current_topic:
+            session.timer_started_at = None
+            return
+
+        now = datetime.utcnow()
+        elapsed = (now - session.timer_started_at).total_seconds()
+        allotted = current_topic.time_minutes * 60
+
+        if elapsed < 0:
+            session.timer_started_at = now
+        elif current_topic.actual_time_spent_seconds + elapsed > allotted:
+            current_topic.actual_time_spent_seconds = max(
+                current_topic.actual_time_spent_seconds, allotted
+            )
+            session.timer_started_at = now
+
     @staticmethod
     def stop_timer(session: Session) -> int:
         if not session.timer_started_at:
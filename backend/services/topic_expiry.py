@@ -0,0 +1,196 @@
+import asyncio
+from typing import Set
+
+from config.settings import settings
+from models.schemas import Session, SessionState
+from services.face_tracker import face_tracker
+from services.frame_dedup import frame_deduplicator
+from services.redis_client import KEY_PREFIX
+from services.session_events import publish_session_event
+from services.session_store import session_store
+from services.timer_scheduler import timer_scheduler
+from services.timer_service import TimerService
+from utils.exceptions import SessionNotFoundException
+
+# Seconds a deadline may fire early and still count as expired
+EXPIRY_TOLERANCE_SECONDS = 0.5
+# Outlives any topic, so a worker that resyncs late cannot repeat an old expiry
+CLAIM_TTL_SECONDS = 24 * 3600
+
+
+class _NotExpired(Exception):
+    """Aborts the auto-advance without writing the session"""
+
+
+class TopicExpiryHandler:
+    """
+    Acts on the deadlines the timer scheduler fires. A deadline is only a
+    hint: the session is re-read before anything is pushed, so a pause,
+    reschedule or another worker that moved the timer just gets a fresh
+    deadline. Expiry is announced with a topic_expired event and, with
+    auto-advance on, the topic is completed after a grace period unless
+    the client did it first.
+
+    With several workers on Redis, each may hold a deadline for the same
+    topic. The first to claim the expiry in Redis announces it; advancing
+    is a versioned write, so only one of them can do that either. Each
+    expiry is handled in its own task, so those round trips never hold up
+    the scheduler or the event loop.
+    """
+
+    def __init__(self, auto_advance: bool, grace_seconds: float, claim_client=None):
+        self.auto_advance = auto_advance
+        self.grace_seconds = max(0.0, grace_seconds)
+        self._redis = claim_client
+        self._tasks: Set[asyncio.Task] = set()
+        self.expired = 0
+        self.advanced = 0
+        self.stale = 0
+        self.claimed_elsewhere = 0
+
+    def sync(self, session: Session) -> None:
+        """
+        Point the session's deadline at its running timer, or drop it. Call
+        with the session a write returned, never from inside a mutate closure
+        """
+        remaining = TimerService.get_remaining_time(session) if session.timer_started_at else None
+        if remaining is None:
+            timer_scheduler.cancel(session.session_id)
+        else:
+            timer_scheduler.schedule(session.session_id, remaining)
+
+    def forget(self, session_id: str) -> None:
+        timer_scheduler.cancel(session_id)
+
+    def start(self) -> int:
+        """Start firing and cover every running timer; returns how many are scheduled"""
+        timer_scheduler.start(self.on_expire)
+
+        # Sessions another worker, or a previous run, started have no deadline here yet
+        for session_id in session_store.get_session_ids_by_state(SessionState.ACTIVE):
+            try:
+                self.sync(session_store.get_session(session_id))
+            except SessionNotFoundException:
+                continue
+        return len(timer_scheduler)
+
+    async def stop(self) -> None:
+        timer_scheduler.stop()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def on_expire(self, session_id: str) -> None:
+        task = asyncio.create_task(self._expire(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _expire(self, session_id: str) -> None:
+        try:
+            session = await session_store.aget_session(session_id)
+        except SessionNotFoundException:
+            return
+
+        remaining = TimerService.get_remaining_time(session)
+        if session.state != SessionState.ACTIVE or session.timer_started_at is None or remaining is None:
+            self.stale += 1
+            return
+        if remaining > EXPIRY_TOLERANCE_SECONDS:
+            self.stale += 1
+            timer_scheduler.schedule(session_id, remaining)
+            return
+
+        overdue = -remaining
+        if self.auto_advance and overdue >= self.grace_seconds:
+            await self._advance(session_id, session.current_topic_index)
+            return
+
+        # Every worker keeps its own auto-advance deadline, in case the
+        # one that announced the expiry goes away
+        if self.auto_advance:
+            timer_scheduler.schedule(session_id, self.grace_seconds - overdue)
+        if not await self._claim(session):
+            self.claimed_elsewhere += 1
+            return
+
+        self.expired += 1
+        publish_session_event(
+            session,
+            "topic_expired",
+            topic_index=session.current_topic_index,
+            auto_advance_in=round(self.grace_seconds - overdue, 1) if self.auto_advance else None
+        )
+
+    async def _claim(self, session: Session) -> bool:
+        """Whether this worker is the one to announce the current topic's expiry"""
+        if self._redis is None:
+            return True
+
+        # A pause and resume restarts the timer, so that expiry is a new one
+        key = (
+            f"{KEY_PREFIX}expired:{session.session_id}:"
+            f"{session.current_topic_index}:{session.timer_started_at.isoformat()}"
+        )
+        try:
+            return bool(await asyncio.to_thread(self._redis.set, key, 1, nx=True, ex=CLAIM_TTL_SECONDS))
+        except Exception:
+            # A duplicate event beats a missing one
+            return True
+
+    async def _advance(self, session_id: str, topic_index: int) -> None:
+        def advance(current: Session) -> None:
+            if (
+                current.state != SessionState.ACTIVE
+                or current.current_topic_index != topic_index
+                or current.timer_started_at is None
+            ):
+                raise _NotExpired()
+
+            remaining = TimerService.get_remaining_time(current)
+            if remaining is None or remaining > EXPIRY_TOLERANCE_SECONDS:
+                raise _NotExpired()
+
+            TimerService.advance_topic(current, completed=True)
+
+        try:
+            session = await session_store.amutate(session_id, advance)
+        except (_NotExpired, SessionNotFoundException):
+            self.stale += 1
+            return
+
+        self.sync(session)
+        self.advanced += 1
+        if session.state == SessionState.COMPLETED:
+            face_tracker.forget(session_id)
+            frame_deduplicator.forget(session_id)
+            publish_session_event(session, "session_completed", auto_advanced=True)
+        else:
+            publish_session_event(session, "topic_changed", auto_advanced=True)
+
+    def get_stats(self) -> dict:
+        return {
+            **timer_scheduler.get_stats(),
+            "auto_advance": self.auto_advance,
+            "grace_seconds": self.grace_seconds,
+            "expired": self.expired,
+            "advanced": self.advanced,
+            "stale": self.stale,
+            "claimed_elsewhere": self.claimed_elsewhere
+        }
+
+
+def build_topic_expiry() -> TopicExpiryHandler:
+    """Expiry handler for this process; on Redis, workers claim each expiry there"""
+    claim_client = None
+    if settings.SESSION_BACKEND.lower() == "redis":
+        from services.redis_client import get_redis
+        claim_client = get_redis()
+
+    return TopicExpiryHandler(
+        auto_advance=settings.TOPIC_AUTO_ADVANCE,
+        grace_seconds=settings.TOPIC_AUTO_ADVANCE_GRACE_SECONDS,
+        claim_client=claim_client
+    )
+
+
+topic_expiry = build_topic_expiry()
@@ -0,0 +1,97 @@
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Set
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(name: str) -> str:
+    """Case-folded words separated by single spaces, punctuation dropped"""
+    return " ".join(_NON_WORD.sub(" ", name.casefold()).split())
+
+
+class TopicMatcher:
+    """
+    Maps the topic names an LLM writes back onto the original topics, each
+    original used at most once. Built once per allocation; every lookup
+    tries, in order:
+
+    1. exact normalized name, and nothing else if it names a topic
+    2. the returned name starts with a topic name ("Algebra basics")
+    3. a topic name starts with the returned name ("Thermo" -> "Thermodynamics")
+    4. best word overlap, if it covers at least half the words
+    """
+
+    MIN_TOKEN_SCORE = 0.5
+
+    def __init__(self, topics: List[Dict[str, Any]]):
+        self.topics = topics
+        self.assigned: Set[int] = set()
+
+        self._norms = [normalize(t["name"]) for t in topics]
+        self._exact: Dict[str, List[int]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        for i, norm in enumerate(self._norms):
+            self._exact.setdefault(norm, []).append(i)
+            for token in norm.split():
+                self._tokens.setdefault(token, set()).add(i)
+
+        self._sorted = sorted((norm, i) for i, norm in enumerate(self._norms))
+        self._sorted_keys = [norm for norm, _ in self._sorted]
+
+    @property
+    def unassigned(self) -> List[int]:
+        return [i for i in range(len(self.topics)) if i not in self.assigned]
+
+    @property
+    def complete(self) -> bool:
+        return len(self.assigned) == len(self.topics)
+
+    def _free(self, candidates) -> Optional[int]:
+        return next((i for i in candidates if i not in self.assigned), None)
+
+    def _lookup(self, norm: str) -> Optional[int]:
+        exact = self._exact.get(norm)
+        if exact is not None:
+            # A name that is a topic's own name means that topic: once it is
+            # taken, a repeat must not claim a longer name ("Chapter 1" vs "Chapter 10")
+            return self._free(exact)
+
+        # Longest topic name that the returned name starts with, on a word boundary
+        words = norm.split()
+        for end in range(len(words) - 1, 0, -1):
+            found = self._free(self._exact.get(" ".join(words[:end]), ()))
+            if found is not None:
+                return found
+
+        # Topic names that start with the returned name: a contiguous sorted range
+        start = bisect.bisect_left(self._sorted_keys, norm)
+        for pos in range(start, len(self._sorted)):
+            key, i = self._sorted[pos]
+            if not key.startswith(norm):
+                break
+            if i not in self.assigned:
+                return i
+
+        scores: Dict[int, int] = {}
+        for token in set(words):
+            for i in self._tokens.get(token, ()):
+                if i not in self.assigned:
+                    scores[i] = scores.get(i, 0) + 1
+        if not scores:
+            return None
+
+        best = max(scores, key=lambda i: (scores[i] / len(set(words) | set(self._norms[i].split())), -i))
+        overlap = scores[best] / len(set(words) | set(self._norms[best].split()))
+        return best if overlap >= self.MIN_TOKEN_SCORE else None
+
+    def assign(self, name: str) -> Optional[int]:
+        """Index of the original topic this name refers to, claiming it; None if no free match"""
+        norm = normalize(name)
+        if not norm:
+            return None
+
+        found = self._lookup(norm)
+        if found is not None:
+            self.assigned.add(found)
+        return found
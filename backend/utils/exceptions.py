@@ -50,3 +50,30 @@ class RescheduleException(MindTrackException):
             detail=f"Rescheduling failed: {detail}",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+class InferenceQueueFullException(MindTrackException):
+    """Raised when the inference engine cannot accept more frames"""
+    def __init__(self):
+        super().__init__(
+            detail="Emotion inference queue is full, retry later",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class FrameTooLargeException(MindTrackException):
+    """Raised when an uploaded frame exceeds MAX_FRAME_BYTES"""
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            detail=f"Frame exceeds the {max_bytes} byte upload limit",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+
+class SessionConflictException(MindTrackException):
+    """Raised when a session changed between being read and written back"""
+    def __init__(self, session_id: str):
+        super().__init__(
+            detail=f"Session '{session_id}' was modified concurrently, retry the request",
+            status_code=status.HTTP_409_CONFLICT
+        )
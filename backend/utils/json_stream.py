@@ -0,0 +1,98 @@
+import json
+from typing import Any, List, Optional
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for one array field of a top-level JSON object, e.g.
+    the "schedule" of {"schedule": [{...}, {...}]}. feed() takes arbitrary
+    text chunks and returns each array element as soon as it has closed, so
+    callers can act on it while the rest is still being generated. Only the
+    unfinished tail is kept between feeds, and an element that is not valid
+    JSON is skipped without losing the others.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.done = False
+
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume more text; returns the elements completed by it"""
+        if self.done:
+            return []
+
+        self._text += chunk
+        text = self._text
+        items: List[Any] = []
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif c == "," and self._depth == 1:
+                self._current_key = None
+            elif c in "{[":
+                if c == "{" and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+                if c == "[" and self._array_depth is None and self._depth == 2 and self._current_key == self.key:
+                    self._array_depth = self._depth
+            elif c in "}]":
+                self._depth -= 1
+                if c == "}" and self._depth == self._array_depth and self._item_start is not None:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except ValueError:
+                        self.skipped += 1
+                    self._item_start = None
+                elif c == "]" and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self.done = True
+                    self._pos = i + 1
+                    return items
+
+        self._pos = len(text)
+        self._trim()
+        return items
+
+    def _trim(self) -> None:
+        """Drop text already consumed, keeping any open element or string"""
+        cut = self._pos
+        if self._item_start is not None:
+            cut = min(cut, self._item_start)
+        if self._in_string:
+            cut = min(cut, self._string_start)
+        if not cut:
+            return
+
+        self._text = self._text[cut:]
+        self._pos -= cut
+        self._string_start -= cut
+        if self._item_start is not None:
+            self._item_start -= cut
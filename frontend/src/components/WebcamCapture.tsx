@@ -1,19 +1,29 @@
 import { useEffect, useRef } from "react";
 import { toast } from "@/hooks/use-toast";
 import { useSession } from "@/context/SessionContext";
+import { emotionStreamUrl } from "@/services/api";
+import type { EmotionDetectResult } from "@/types/session";
 
 interface Props {
-  onCapture: (blob: Blob) => void;
+  onResult: (result: EmotionDetectResult) => void;
   intervalMs: number;
   active: boolean;
 }
 
-const WebcamCapture = ({ onCapture, intervalMs, active }: Props) => {
+const WebcamCapture = ({ onResult, intervalMs, active }: Props) => {
 
   const videoRef = useRef<HTMLVideoElement>(null);
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const streamRef = useRef<MediaStream | null>(null);
-  const intervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const timeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  // the server suggests when to send the next frame; intervalMs until it does
+  const nextDelayRef = useRef(intervalMs);
+  const socketRef = useRef<WebSocket | null>(null);
+  const awaitingRef = useRef(false);
+
+  // keep the latest handler without reopening the socket
+  const onResultRef = useRef(onResult);
+  onResultRef.current = onResult;
 
   const { setEmotionStatus } = useSession();
 
@@ -24,59 +34,128 @@ const WebcamCapture = ({ onCapture, intervalMs, active }: Props) => {
       return;
     }
 
-    const startCapture = async () => {
+    nextDelayRef.current = intervalMs;
 
-      try {
+    const schedule = (delay: number) => {
+      if (timeoutRef.current) clearTimeout(timeoutRef.current);
+      timeoutRef.current = setTimeout(capture, delay);
+    };
 
-        const stream = await navigator.mediaDevices.getUserMedia({ video: true });
+    // -----------------------------
+    // FRAME STREAM SOCKET
+    // -----------------------------
+    const connect = () => {
 
-        toast({ title: "📷 Camera Started" });
-        setEmotionStatus("Camera Active");
+      const socket = new WebSocket(emotionStreamUrl);
+      awaitingRef.current = false;
 
-        streamRef.current = stream;
+      socket.onmessage = (event) => {
 
-        if (videoRef.current) {
-          videoRef.current.srcObject = stream;
-          await videoRef.current.play();
+        awaitingRef.current = false;
+
+        const data: EmotionDetectResult = JSON.parse(event.data);
+
+        // count the next wait from this reply, not from when the frame was sent
+        if (data.next_capture_ms) {
+          nextDelayRef.current = data.next_capture_ms;
+          schedule(data.next_capture_ms);
         }
 
-        intervalRef.current = setInterval(() => {
+        if (data.error) {
+          console.error("Emotion stream error:", data.error);
+          setEmotionStatus("API Issue");
+          return;
+        }
+
+        onResultRef.current(data);
+      };
+
+      socket.onerror = () => {
+        setEmotionStatus("Stream Issue");
+      };
+
+      socket.onclose = () => {
+        awaitingRef.current = false;
+      };
+
+      socketRef.current = socket;
+    };
+
+    // -----------------------------
+    // CAPTURE LOOP
+    // -----------------------------
+    const capture = () => {
+
+      // fallback tick in case no reply comes back; a reply reschedules it
+      schedule(nextDelayRef.current);
+
+      const socket = socketRef.current;
+
+      if (!socket || socket.readyState === WebSocket.CLOSED) {
+        connect();
+        return;
+      }
+
+      // one frame in flight at a time
+      if (socket.readyState !== WebSocket.OPEN || awaitingRef.current) return;
 
-          if (!videoRef.current || !canvasRef.current) {
-            setEmotionStatus("Capture Fail");
-            return;
-          }
+      if (!videoRef.current || !canvasRef.current) {
+        setEmotionStatus("Capture Fail");
+        return;
+      }
+
+      const canvas = canvasRef.current;
+      const video = videoRef.current;
 
-          const canvas = canvasRef.current;
-          const video = videoRef.current;
+      canvas.width = video.videoWidth || 640;
+      canvas.height = video.videoHeight || 480;
 
-          canvas.width = video.videoWidth || 640;
-          canvas.height = video.videoHeight || 480;
+      const ctx = canvas.getContext("2d");
 
-          const ctx = canvas.getContext("2d");
+      if (!ctx) {
+        setEmotionStatus("Canvas Fail");
+        return;
+      }
 
-          if (!ctx) {
-            setEmotionStatus("Canvas Fail");
-            return;
-          }
+      ctx.drawImage(video, 0, 0);
 
-          ctx.drawImage(video, 0, 0);
+      awaitingRef.current = true;
 
-          canvas.toBlob((blob) => {
+      canvas.toBlob((blob) => {
 
-            if (!blob) {
-              setEmotionStatus("Blob Fail");
-              return;
-            }
+        if (!blob || socket.readyState !== WebSocket.OPEN) {
+          awaitingRef.current = false;
+          if (!blob) setEmotionStatus("Blob Fail");
+          return;
+        }
 
-            toast({ title: "📸 Image Sent" });
-            setEmotionStatus("Sending...");
+        setEmotionStatus("Detecting...");
 
-            onCapture(blob);
+        socket.send(blob);
 
-          }, "image/jpeg", 0.7);
+      }, "image/jpeg", 0.7);
 
-        }, intervalMs);
+    };
+
+    const startCapture = async () => {
+
+      try {
+
+        const stream = await navigator.mediaDevices.getUserMedia({ video: true });
+
+        toast({ title: "📷 Camera Started" });
+        setEmotionStatus("Camera Active");
+
+        streamRef.current = stream;
+
+        if (videoRef.current) {
+          videoRef.current.srcObject = stream;
+          await videoRef.current.play();
+        }
+
+        connect();
+
+        schedule(nextDelayRef.current);
 
       } catch (err: any) {
 
@@ -97,8 +176,13 @@ const WebcamCapture = ({ onCapture, intervalMs, active }: Props) => {
 
     return () => {
 
-      if (intervalRef.current)
-        clearInterval(intervalRef.current);
+      if (timeoutRef.current)
+        clearTimeout(timeoutRef.current);
+
+      if (socketRef.current) {
+        socketRef.current.close();
+        socketRef.current = null;
+      }
 
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(t => t.stop());
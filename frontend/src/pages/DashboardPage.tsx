@@ -1,7 +1,8 @@
 import { useEffect, useRef, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { useSession } from "@/context/SessionContext";
-import { sessionApi, emotionApi } from "@/services/api";
+import { sessionApi, sessionEventsUrl } from "@/services/api";
+import type { EmotionDetectResult, SessionEvent } from "@/types/session";
 import { toast } from "@/hooks/use-toast";
 import TimerDisplay from "@/components/TimerDisplay";
 import TopicInfo from "@/components/TopicInfo";
@@ -28,7 +29,6 @@ const DashboardPage = () => {
   } = useSession();
 
   const timerRef = useRef<ReturnType<typeof setInterval> | null>(null);
-  const isDetectingRef = useRef(false);
 
   // -----------------------------
   // FETCH CURRENT TOPIC
@@ -60,6 +60,51 @@ const DashboardPage = () => {
     };
   }, [fetchCurrent]);
 
+  // -----------------------------
+  // SERVER PUSH (SSE)
+  // -----------------------------
+  useEffect(() => {
+
+    const source = new EventSource(sessionEventsUrl);
+
+    source.onmessage = (message) => {
+
+      const event: SessionEvent = JSON.parse(message.data);
+
+      if (event.type === "session_completed") {
+        source.close();
+        navigate("/summary");
+        return;
+      }
+
+      if (event.type === "session_deleted") {
+        source.close();
+        navigate("/setup");
+        return;
+      }
+
+      const snapshot = event.session;
+
+      if (snapshot.topic) setCurrentTopic(snapshot.topic);
+
+      // countdown keeps running locally, pushes only re-sync it
+      if (snapshot.timer_remaining_seconds !== null) {
+        setRemainingSeconds(snapshot.timer_remaining_seconds);
+      }
+
+      if (snapshot.state === "active" || snapshot.state === "paused") {
+        setSessionState(snapshot.state);
+      }
+
+      if (event.type === "emotion_trigger") {
+        setBreakModalOpen(true);
+      }
+    };
+
+    return () => source.close();
+
+  }, [navigate, setCurrentTopic, setRemainingSeconds, setSessionState, setBreakModalOpen]);
+
   // -----------------------------
   // TIMER LOOP
   // -----------------------------
@@ -101,11 +146,8 @@ const DashboardPage = () => {
 
       if (data?.session_complete) {
         navigate("/summary");
-        return;
       }
 
-      await fetchCurrent();
-
     } catch {
       toast({
         title: "Error",
@@ -122,11 +164,8 @@ const DashboardPage = () => {
 
       if (data?.session_complete) {
         navigate("/summary");
-        return;
       }
 
-      await fetchCurrent();
-
     } catch {
       toast({
         title: "Error",
@@ -166,35 +205,17 @@ const DashboardPage = () => {
   // -----------------------------
   // SAFE EMOTION HANDLER
   // -----------------------------
-  const handleEmotionCheck = useCallback(async (blob: Blob) => {
+  const handleEmotionResult = useCallback((result: EmotionDetectResult) => {
 
     if (!emotionMonitoringEnabled) return;
     if (isOnBreak) return;               // 🔥 STOP DURING BREAK
-    if (isDetectingRef.current) return;
-
-    isDetectingRef.current = true;
 
-    try {
-
-      setEmotionStatus("Detecting...");
-
-      const detectRes = await emotionApi.detect(blob);
-
-      if (detectRes?.data?.emotion) {
-        setEmotionStatus(detectRes.data.emotion);
-      }
-
-      const { data } = await emotionApi.getStatus();
-
-      if (data.trigger_ready) {
-        setBreakModalOpen(true);
-      }
+    if (result.emotion) {
+      setEmotionStatus(result.emotion);
+    }
 
-    } catch (err) {
-      console.error("Emotion API error:", err);
-      setEmotionStatus("API Issue");
-    } finally {
-      isDetectingRef.current = false;
+    if (result.trigger_ready) {
+      setBreakModalOpen(true);
     }
 
   }, [emotionMonitoringEnabled, isOnBreak, setEmotionStatus, setBreakModalOpen]);
@@ -214,7 +235,7 @@ const DashboardPage = () => {
 
       {/* 🔥 CAMERA NOW DISABLED DURING BREAK */}
       <WebcamCapture
-        onCapture={handleEmotionCheck}
+        onResult={handleEmotionResult}
         intervalMs={3000}
         active={sessionState === "active" && emotionMonitoringEnabled && !isOnBreak}
       />
@@ -6,9 +6,36 @@ import type {
   SessionSummary,
 } from "@/types/session";
 
+export const API_BASE_URL = "http://localhost:8000";
+
+// Sessions are scoped to this per-browser identity
+const CLIENT_ID_KEY = "mindtrack-client-id";
+
+const getClientId = () => {
+  let id = localStorage.getItem(CLIENT_ID_KEY);
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem(CLIENT_ID_KEY, id);
+  }
+  return id;
+};
+
+export const clientId = getClientId();
+
+// EventSource and WebSocket cannot send headers, so pass it as a query param
+const clientQuery = `?client_id=${encodeURIComponent(clientId)}`;
+
+export const emotionStreamUrl =
+  API_BASE_URL.replace(/^http/, "ws") + "/api/emotions/stream" + clientQuery;
+
+export const sessionEventsUrl = API_BASE_URL + "/api/sessions/events" + clientQuery;
+
 const api = axios.create({
-  baseURL: "http://localhost:8000",
+  baseURL: API_BASE_URL,
   timeout: 15000,
+  headers: {
+    "X-Client-Id": clientId,
+  },
 });
 
 export const sessionApi = {
@@ -32,16 +59,12 @@ export const sessionApi = {
 };
 
 export const emotionApi = {
-  detect: (imageBlob: Blob) => {
-    const formData = new FormData();
-    formData.append("file", imageBlob, "frame.jpg");
-
-    return api.post("/api/emotions/detect", formData, {
+  detect: (imageBlob: Blob) =>
+    api.post("/api/emotions/detect/raw", imageBlob, {
       headers: {
-        "Content-Type": "multipart/form-data",
+        "Content-Type": "image/jpeg",
       },
-    });
-  },
+    }),
 
   getStatus: () =>
     api.get<EmotionStatus>("/api/emotions/status"),
@@ -42,6 +42,47 @@ export interface EmotionStatus {
   message?: string;
 }
 
+export interface SessionSnapshot {
+  session_id: string;
+  state: SessionState | "rescheduling";
+  topic: TopicResponse | null;
+  index: number;
+  total_topics: number;
+  timer_remaining_seconds: number | null;
+  timer_running: boolean;
+  server_time: string;
+}
+
+export interface SessionEvent {
+  type:
+    | "state"
+    | "topic_changed"
+    | "topic_expired"
+    | "session_paused"
+    | "session_resumed"
+    | "rescheduled"
+    | "schedule_refined"
+    | "emotion_trigger"
+    | "session_completed"
+    | "session_deleted";
+  session: SessionSnapshot;
+  message?: string;
+  auto_advance_in?: number | null;
+  auto_advanced?: boolean;
+}
+
+export interface EmotionDetectResult {
+  emotion?: string;
+  trigger_ready?: boolean;
+  message?: string;
+  cached?: boolean;
+  buffer?: string[];
+  probabilities?: Record<string, number> | null;
+  next_capture_ms?: number;
+  error?: string;
+  status_code?: number;
+}
+
 export interface SessionSummary {
   total_topics: number;
   completed_count: number;